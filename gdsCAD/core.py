@@ -45,6 +45,7 @@ import struct
 import numbers
 import inspect
 import datetime
+import logging
 import warnings
 import numpy as np
 import copy
@@ -57,6 +58,7 @@ try:
     import matplotlib.patches
     import matplotlib.text
     import matplotlib.lines
+    import matplotlib.collections
     import matplotlib.transforms as transforms
     import matplotlib.cm
     import shapely.geometry
@@ -69,12 +71,28 @@ try:
 except ImportError as err:
     warnings.warn(str(err) + '. It will not be possible to import DXF artwork.')
 
+log = logging.getLogger(__name__)
+
 if sys.version > '3':
     long = int
 
 default_layer = 1
 default_datatype = 0
 
+# Drawings with more polygons than this are rasterized when shown or saved
+_raster_limit = 10000
+
+# Default layer colors, filled by ElementBase._layer_properties
+_layer_colors = []
+
+# A token replaced whenever the geometry of any element, reference or cell
+# changes. Cached Cell bounding boxes are only valid for the token they were
+# computed under, however the changed object is shared between cells.
+_geometry = [object()]
+
+def _geometry_changed():
+    _geometry[0] = object()
+
 def _show(self):
     """
     Display the object
@@ -89,10 +107,16 @@ def _show(self):
     textbox = []    
     
     artists=self.artist()
+    npolys=sum(len(a.get_paths()) if isinstance(a, matplotlib.collections.Collection) else 1 for a in artists)
+    rasterize=npolys > _raster_limit
     for a in artists:
+        if rasterize:
+            a.set_rasterized(True)
         a.set_transform(a.get_transform() + ax.transData)
         if isinstance(a, matplotlib.patches.Patch):
             ax.add_patch(a)
+        elif isinstance(a, matplotlib.collections.Collection):
+            ax.add_collection(a)
         elif isinstance(a, matplotlib.lines.Line2D):
             ax.add_line(a)
         else:
@@ -108,6 +132,50 @@ def _show(self):
     
     return ax
 
+def _transform_artists(artists, transform):
+    """
+    Append a transform to that of each artist in a list
+
+    :param artists: A list of matplotlib artists
+    :param transform: The transform to apply after each artist's own
+    :returns: ``artists``
+    """
+    for a in artists:
+        a.set_transform(a.get_transform() + transform)
+
+    return artists
+
+def _polygon_areas(polygons):
+    """
+    Areas of a list of polygons, computed together by the shoelace formula
+
+    :param polygons: A list of Nx2 vertex arrays
+    :returns: An array with the area of each polygon
+    """
+    lengths = np.array([len(p) for p in polygons])
+    starts = np.cumsum(lengths) - lengths
+    # Separate contiguous x and y arrays, measured relative to the first
+    # vertex of each polygon to limit round off
+    (x, y) = np.array(np.concatenate(polygons).T, dtype=np.float64, order='C')
+    x -= np.repeat(x[starts], lengths)
+    y -= np.repeat(y[starts], lengths)
+    nxt = np.arange(1, len(x) + 1)
+    nxt[starts + lengths - 1] = starts
+    cross = x * y[nxt] - x[nxt] * y
+    return np.abs(np.add.reduceat(cross, starts)) / 2
+
+def _invariant_point(pts, point):
+    """
+    Resolve the point held fixed by a rotation or scaling
+
+    :param pts: The points being transformed
+    :param point: A 2D vector, or the string 'com' for the centre of mass of ``pts``
+    :returns: The invariant point as an array
+    """
+    if isinstance(point, str) and point.lower()=='com':
+        return pts.mean(0)
+    return np.asarray(point)
+
 
 
 class BooleanOps(object):
@@ -178,10 +246,11 @@ class ElementBase(BooleanOps, object):
     """
     @staticmethod
     def _layer_properties(layer):
-        # Default colors from previous versions
-        colors = ['k', 'r', 'g', 'b', 'c', 'm', 'y']
-        colors += matplotlib.cm.gist_ncar(np.linspace(0.98, 0, 15)).tolist()
-        color = colors[layer % len(colors)]
+        # Default colors from previous versions, built on first use
+        if not _layer_colors:
+            _layer_colors.extend(['k', 'r', 'g', 'b', 'c', 'm', 'y'])
+            _layer_colors.extend(tuple(c) for c in matplotlib.cm.gist_ncar(np.linspace(0.98, 0, 15)).tolist())
+        color = _layer_colors[layer % len(_layer_colors)]
         return {'color': color}
 
     def __init__(self, points, dtype=np.float32):
@@ -201,6 +270,7 @@ class ElementBase(BooleanOps, object):
         """
         self._points = np.array(points, dtype=dtype)
         self._bbox = None
+        _geometry_changed()
         return self
 
     @property
@@ -229,8 +299,14 @@ class ElementBase(BooleanOps, object):
             
         The transformation acts in place.
         """
-        self._points += np.array(displacement)
-        self._bbox = None
+        dtype = self._points.dtype
+        displacement = np.asarray(displacement)
+        self._points += displacement
+        _geometry_changed()
+        if self._bbox is not None:
+            # The extreme points stay extreme, so move the cached box with them,
+            # rounded to the dtype of the points as they were
+            self._bbox = (self._bbox + displacement).astype(dtype).astype(float)
         return self
             
     def rotate(self, angle, center=(0, 0)):
@@ -248,15 +324,15 @@ class ElementBase(BooleanOps, object):
         """
 
         ang = angle * np.pi/180
-        m=np.array([[np.cos(ang), -np.sin(ang)], [np.sin(ang), np.cos(ang)]])
+        (c, s) = (np.cos(ang), np.sin(ang))
+        m=np.array([[c, -s], [s, c]])
     
-        if isinstance(center, str) and center.lower()=='com':
-            center=self.points.mean(0)
-        else:    
-            center=np.array(center)
+        points=self._points
+        center=_invariant_point(points, center)
     
-        self._points = m.dot((self.points-center).T).T+center
+        self._points = m.dot((points-center).T).T+center
         self._bbox = None
+        _geometry_changed()
         return self    
 
 
@@ -298,15 +374,17 @@ class ElementBase(BooleanOps, object):
         The transformation acts in place.
         
         """
-        if isinstance(origin, str) and origin.lower()=='com':
-            origin=self.points.mean(0)
-        else:    
-            origin=np.array(origin)
+        origin=_invariant_point(self.points, origin)
             
-        k=np.array(k)
+        k=np.asarray(k)
         
+        dtype = self._points.dtype
         self._points=(self.points-origin)*k+origin
-        self._bbox = None
+        _geometry_changed()
+        if self._bbox is not None:
+            # Scaling maps the old extremes onto the new ones, swapped where k<0
+            bb = (self._bbox.astype(dtype)-origin)*k+origin
+            self._bbox = np.sort(np.array(bb, dtype=float), 0)
         return self    
 
     @property
@@ -319,13 +397,11 @@ class ElementBase(BooleanOps, object):
             return self._bbox.copy()
 
         bb = np.zeros([2,2])
-        bb[0,0] = self._points[:,0].min()
-        bb[0,1] = self._points[:,1].min()
-        bb[1,0] = self._points[:,0].max()
-        bb[1,1] = self._points[:,1].max()
+        bb[0] = self._points.min(0)
+        bb[1] = self._points.max(0)
 
         self._bbox = bb
-        return bb
+        return bb.copy()
         
 
 class Boundary(ElementBase):
@@ -397,7 +473,7 @@ class Boundary(ElementBase):
         """
         Calculates the area of the element.
         """
-        return self.shape.area
+        return float(_polygon_areas([self._points])[0])
 
     def centroid(self):
         """
@@ -412,15 +488,15 @@ class Boundary(ElementBase):
         """
         Returns True if coordinates are in counter-clockwise order
         """
-        points = self.points.tolist()
-        return sum((points[i+1][0]-points[i][0])*(points[i+1][1]+points[i][1]) for i in range(len(points)-1)) < 0
+        x, y = self._points.T
+        return np.dot(x[1:]-x[:-1], y[1:]+y[:-1]) < 0
 
     def to_ccw(self):
         """
         Fixes coordinates to be in counter-clockwise order
         """
         if not self.is_ccw():
-            self.points = list(reversed(self.points.tolist()))
+            self.points = self._points[::-1]
 
     def to_gds(self, multiplier): 
         """
@@ -432,7 +508,15 @@ class Boundary(ElementBase):
         :returns: The GDSII binary string that represents this object.
         """
         gds_coordinates = np.array(np.round(self._points * multiplier), dtype='>i4')
+        return self._gds_record(gds_coordinates)
 
+    def _gds_record(self, gds_coordinates):
+        """
+        Build the GDSII element from coordinates already scaled and rounded.
+
+        :param gds_coordinates: Array of big-endian 32 bit integer vertices.
+        :returns: The GDSII binary string that represents this object.
+        """
         nr_points = gds_coordinates.shape[0]
         export_pos = 0
 
@@ -518,6 +602,11 @@ class Path(ElementBase):
     """
     show=_show
 
+    # Shapely buffer cap styles for each pathtype, and the mitre limit of
+    # the square joins
+    _cap_styles = {0:2, 1:1, 2:3}
+    _mitre_limit = np.sqrt(2)
+
     def __init__(self, points, width=1.0, layer=None, datatype=None, laydat=None, pathtype=0, verbose=False, dtype=np.float32):
         ElementBase.__init__(self, points, dtype=dtype)
 
@@ -607,10 +696,8 @@ class Path(ElementBase):
 
         """
         
-        cap_style = {0:2, 1:1, 2:3}
-        points=[tuple(p) for p in self.points]
-        lines = shapely.geometry.LineString(points)
-        poly = lines.buffer(self.width/2., cap_style=cap_style[self.pathtype], join_style=2, mitre_limit=np.sqrt(2))
+        lines = shapely.geometry.LineString(self._points)
+        poly = lines.buffer(self.width/2., cap_style=self._cap_styles[self.pathtype], join_style=2, mitre_limit=self._mitre_limit)
 
         return [descartes.PolygonPatch(poly, lw=0, **self._layer_properties(self.layer))]
 
@@ -619,10 +706,8 @@ class Path(ElementBase):
         """
         A shapely polygon representation of the boundary
         """
-        cap_style = {0:2, 1:1, 2:3} 
-        points=[tuple(p) for p in self.points]
-        line = shapely.geometry.asLineString(points)
-        s = line.buffer(self.width/2., cap_style=cap_style[self.pathtype], join_style=2, mitre_limit=np.sqrt(2))
+        line = shapely.geometry.asLineString(self._points)
+        s = line.buffer(self.width/2., cap_style=self._cap_styles[self.pathtype], join_style=2, mitre_limit=self._mitre_limit)
         s.laydat = self.laydat
         return s
 
@@ -879,7 +964,7 @@ class Elements(BooleanOps, object):
             return #Empty list
 
         # A list of elements => Create an identical list
-        if isinstance(obj[0], ElementBase):
+        if len(obj) and isinstance(obj[0], ElementBase):
             self._check_obj_list(obj)
             self.obj=list(obj)
             layer = obj[0].layer
@@ -999,6 +1084,7 @@ class Elements(BooleanOps, object):
         if isinstance(obj, Elements):
             self._check_obj_list(obj)
             self.obj.extend(obj)
+            _geometry_changed()
             return
             
         if not isinstance(obj, ElementBase):
@@ -1009,6 +1095,7 @@ class Elements(BooleanOps, object):
             self.datatype = obj.datatype
 
         self.obj.append(obj)
+        _geometry_changed()
 
     def remove(self, element):
         """
@@ -1023,6 +1110,7 @@ class Elements(BooleanOps, object):
         
         for e in element:
             self.obj.remove(e)
+        _geometry_changed()
 
     def __len__(self):
         """
@@ -1042,6 +1130,7 @@ class Elements(BooleanOps, object):
         Set a new element at index
         """
         self.obj[index]=value
+        _geometry_changed()
 
     def __iter__(self):
         """
@@ -1058,7 +1147,7 @@ class Elements(BooleanOps, object):
 
         The transformation acts in place.
         """
-        displacement=np.array(displacement)
+        displacement=np.asarray(displacement)
         for p in self:
             p.translate(displacement)
         return self
@@ -1118,9 +1207,12 @@ class Elements(BooleanOps, object):
         """
         Calculate the area of the elements.
         """
-        area = 0        
+        # The boundaries are measured together, anything else one by one
+        boundaries = [e._points for e in self if isinstance(e, Boundary)]
+        area = float(_polygon_areas(boundaries).sum()) if boundaries else 0
         for e in self:
-            area += e.area()
+            if not isinstance(e, Boundary):
+                area += e.area()
         
         return area
         
@@ -1141,37 +1233,61 @@ class Elements(BooleanOps, object):
             in the GDSII elements.        
         :returns: The GDSII binary string that represents this object.
         """
-        data = b''
+        # Scale and round the vertices of all boundaries in a single pass
+        boundaries = [p for p in self if isinstance(p, Boundary)]
+        if boundaries:
+            points = np.concatenate([p._points for p in boundaries])
+            gds_coordinates = np.array(np.round(points * multiplier), dtype='>i4')
+            splits = np.cumsum([len(p._points) for p in boundaries])[:-1]
+            gds_coordinates = iter(np.split(gds_coordinates, splits))
 
+        data = []
         for p in self:
-            data += p.to_gds(multiplier)
+            if isinstance(p, Boundary):
+                data.append(p._gds_record(next(gds_coordinates)))
+            else:
+                data.append(p.to_gds(multiplier))
 
-        return data
+        return b''.join(data)
 
     @property
     def bounding_box(self):
         """
         Return the bounding box containing all Elements
         """
-        subboxes=[]
-        for p in self:
-            subboxes.append(p.bounding_box)
+        # The vertices of all boundaries and paths are reduced in one pass
+        polygons=[p._points for p in self if isinstance(p, (Boundary, Path))]
+        subboxes=[p.bounding_box for p in self if not isinstance(p, (Boundary, Path))]
+        if polygons:
+            points=np.concatenate(polygons)
+            subboxes.append(np.array([points.min(0), points.max(0)]))
 
         subboxes=np.array(subboxes)
-        bb = np.array([[min(subboxes[:, 0,0]),
-                          min(subboxes[:, 0,1])],
-                          [max(subboxes[:, 1,0]),
-                          max(subboxes[:, 1,1])]])
+        bb = np.array([subboxes[:, 0].min(0), subboxes[:, 1].max(0)], dtype=float)
 
         return bb
 
     def artist(self, color=None):
         """
         Return a list of matplotlib artists for drawing this object        
+
+        The boundaries on each layer are drawn as a single collection. A lone
+        boundary keeps its own patch, since matplotlib draws a collection of
+        one path as a marker snapped to the pixel grid.
         """
         art=[]
+        boundaries={}
         for p in self:
-            art+=p.artist()
+            if isinstance(p, Boundary):
+                boundaries.setdefault(p.layer, []).append(p)
+            else:
+                art.extend(p.artist())
+        for (layer, bounds) in boundaries.items():
+            if len(bounds) == 1:
+                art.extend(bounds[0].artist())
+            else:
+                art.append(matplotlib.collections.PolyCollection([b.points for b in bounds], closed=True, lw=0,
+                                                                 **ElementBase._layer_properties(layer)))
         return art
 
     @property
@@ -1291,16 +1407,22 @@ class Layout(dict):
         cells=self.get_dependencies()
 
         cell_names = [x.name for x in cells]
-        duplicates = set([x for x in cell_names if cell_names.count(x) > 1])
+        seen = set()
+        duplicates = set()
+        for x in cell_names:
+            if x in seen:
+                duplicates.add(x)
+            seen.add(x)
         if duplicates: 
             print('Duplicate cell names that will be made unique:', ', '.join(duplicates))
 
-        print('Writing the following cells')
-        for cell in cells:
-            if cell.name not in duplicates:
-                print(cell.name+':',cell)
-            else:
-                print(cell.unique_name+':',cell)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug('Writing the following cells')
+            for cell in cells:
+                if cell.name not in duplicates:
+                    log.debug('%s: %s', cell.name, cell)
+                else:
+                    log.debug('%s: %s', cell.unique_name, cell)
 
         longlist=[name for name in sorted(cell_names) if len(name)>32]
         if longlist:
@@ -1336,12 +1458,17 @@ class Layout(dict):
 
         :returns: List of top level cells.
         """
-        top = list(self.values())
-        for cell in self.values():
-            for dependency in cell.get_dependencies():
-                if dependency in top:
-                    top.remove(dependency)
-        return top
+        # Walk the hierarchy once, visiting each referenced cell a single time
+        referenced = set()
+        stack = list(self.values())
+        while stack:
+            cell = stack.pop()
+            for reference in cell._references:
+                if id(reference.ref_cell) not in referenced:
+                    referenced.add(id(reference.ref_cell))
+                    stack.append(reference.ref_cell)
+
+        return [cell for cell in self.values() if id(cell) not in referenced]
 
     @property
     def bounding_box(self):
@@ -1357,8 +1484,7 @@ class Layout(dict):
         boxes=[e.bounding_box for e in top]
         boxes=np.array([b for b in boxes if b is not None]) #discard empty cells
         
-        return np.array([[min(boxes[:,0,0]), min(boxes[:,0,1])],
-                     [max(boxes[:,1,0]), max(boxes[:,1,1])]])
+        return np.array([boxes[:,0].min(0), boxes[:,1].max(0)])
 
     def artist(self):
         """
@@ -1391,6 +1517,7 @@ class Cell(object):
         self.name = str(name)
         self._objects = []
         self._references = []
+        self._bbox = None
 
         now = datetime.datetime.today()
         if created:
@@ -1402,6 +1529,11 @@ class Cell(object):
         else:
             self.modified=now
 
+    def __setattr__(self, name, value):
+        if name in ('_objects', '_references'):
+            _geometry_changed()
+        object.__setattr__(self, name, value)
+
     @property
     def elements(self):
         return self.objects + self.references
@@ -1480,17 +1612,19 @@ class Cell(object):
             
         c = list(self.created.timetuple()[:6])
         m = list(self.modified.timetuple()[:6])
-        data = struct.pack('>16h', 28, 0x0502,
+        # Collect the records and join them once, growing a single string
+        # would copy everything written so far for each element
+        data = [struct.pack('>16h', 28, 0x0502,
                             c[0], c[1], c[2], c[3], c[4], c[5],
                             m[0], m[1], m[2], m[3], m[4], m[5],
-                           4 + len(name), 0x0606) + name.encode('ascii')
-        for element in self:
-            if isinstance(element, ReferenceBase):
-                data += element.to_gds(multiplier, duplicates)
-            else:
-                data += element.to_gds(multiplier)
+                           4 + len(name), 0x0606) + name.encode('ascii')]
+        for element in self._objects:
+            data.append(element.to_gds(multiplier))
+        for reference in self._references:
+            data.append(reference.to_gds(multiplier, duplicates))
                 
-        return data + struct.pack('>2h', 4, 0x0700)
+        data.append(struct.pack('>2h', 4, 0x0700))
+        return b''.join(data)
         
     def copy(self, name=None, suffix=None):
         """
@@ -1533,6 +1667,7 @@ class Cell(object):
         """
         if isinstance(element, Cell):
             self._references.append(CellReference(element, *args, **kwargs))
+            _geometry_changed()
         elif isinstance(element, (ElementBase, Elements, ReferenceBase)):
 
             if len(args)!=0 or len(kwargs)!=0:
@@ -1542,6 +1677,7 @@ class Cell(object):
                 self._references.append(element)
             else:
                 self._objects.append(element)
+            _geometry_changed()
 
         elif isinstance(element, (tuple, list)):
             for e in element:
@@ -1550,7 +1686,30 @@ class Cell(object):
         else:
             raise TypeError('Cannot add type %s to cell.' % type(element))
 
-        self.bb_is_valid = False
+    def extend(self, elements):
+        """
+        Add a sequence of elements to this cell.
+
+        :param elements: An iterable of elements to be inserted in this cell.
+
+        Equivalent to calling :meth:`add` on each element. Any :class:`Cell`
+        in ``elements`` is added by a default :class:`CellReference`.
+        """
+        objects = []
+        references = []
+        for e in elements:
+            if isinstance(e, Cell):
+                references.append(CellReference(e))
+            elif isinstance(e, ReferenceBase):
+                references.append(e)
+            elif isinstance(e, (ElementBase, Elements)):
+                objects.append(e)
+            else:
+                raise TypeError('Cannot add type %s to cell.' % type(e))
+
+        self._objects.extend(objects)
+        self._references.extend(references)
+        _geometry_changed()
     
     def remove(self, element):
         """
@@ -1569,10 +1728,9 @@ class Cell(object):
                 self._references.remove(e)
             else:
                 self._objects.remove(e)
+        _geometry_changed()
 #        self._objects = [e for e in self._objects if e not in element]
 
-        self.bb_is_valid = False
-
     def area(self, by_layer=False):
         """
         Calculate the total area of the elements on this cell, including
@@ -1586,12 +1744,8 @@ class Cell(object):
         if by_layer:
             cell_area = {}
             for element in self.elements:
-                element_area = element.area(True)
-                for ll in element_area.iterkeys():
-                    if ll in cell_area:
-                        cell_area[ll] += element_area[ll]
-                    else:
-                        cell_area[ll] = element_area[ll]
+                for (ll, a) in element.area(True).items():
+                    cell_area[ll] = cell_area.get(ll, 0) + a
         else:
             cell_area = 0
             for element in self.elements:
@@ -1604,13 +1758,13 @@ class Cell(object):
 
         :returns: True if the cell and all of its subcells contain no elements
         """        
-        blacklist=[]
+        blacklist=set()
         for c in self.references:
              val=c.ref_cell.prune()
              if val:
-                 blacklist += [c]
+                 blacklist.add(id(c))
     
-        self._references=[e for e in self.references if e not in blacklist]
+        self._references=[e for e in self._references if id(e) not in blacklist]
 
         return False if len(self) else True
         
@@ -1620,12 +1774,17 @@ class Cell(object):
 
         :returns: List of the layers used in this cell.
         """
+        # Visit each cell of the hierarchy once, however often it is referenced
         layers = set()
-        for element in self.elements:
-            if isinstance(element, (ElementBase, Elements)):
-                layers.add(element.layer)
-            elif isinstance(element, ReferenceBase):
-                layers |= set(element.ref_cell.get_layers())
+        seen = set()
+        stack = [self]
+        while stack:
+            cell = stack.pop()
+            if id(cell) in seen:
+                continue
+            seen.add(id(cell))
+            layers.update(element.layer for element in cell._objects)
+            stack.extend(reference.ref_cell for reference in cell._references)
 
         return list(layers)
 
@@ -1648,15 +1807,29 @@ class Cell(object):
         
         :returns: Bounding box of this cell [[x_min, y_min], [x_max, y_max]], or
             ``None`` if the cell is empty.
+
+        The box is cached until the geometry of any element, reference or cell
+        changes. Changes made in place to arrays, such as the points of an
+        element, are not seen.
         """
+        cached = getattr(self, '_bbox', None)
+        if cached is not None and cached[0] is _geometry[0]:
+            return cached[1].copy()
+
         if len(self) == 0:
             return None
 
-        boxes=[e.bounding_box for e in self]
+        # The vertices of all boundaries and paths are reduced in one pass
+        polygons=[e._points for e in self._objects if isinstance(e, (Boundary, Path))]
+        boxes=[e.bounding_box for e in self if not isinstance(e, (Boundary, Path))]
+        if polygons:
+            points=np.concatenate(polygons)
+            boxes.append(np.array([points.min(0), points.max(0)]))
         boxes=np.array([b for b in boxes if b is not None])
         
-        return np.array([[min(boxes[:,0,0]), min(boxes[:,0,1])],
-                     [max(boxes[:,1,0]), max(boxes[:,1,1])]])
+        bbox = np.array([boxes[:,0].min(0), boxes[:,1].max(0)], dtype=float)
+        self._bbox = (_geometry[0], bbox)
+        return bbox.copy()
 
 
     def get_dependencies(self, include_elements=False):
@@ -1729,6 +1902,10 @@ class ReferenceBase:
     def __init__(self):
         pass
 
+    def __setattr__(self, name, value):
+        _geometry_changed()
+        self.__dict__[name] = value
+
     def __len__(self):
         return len(self.ref_cell)
 
@@ -1743,7 +1920,7 @@ class ReferenceBase:
         :returns: self
 
         """
-        self.origin+=np.array(displacement)
+        self.origin+=np.asarray(displacement)
         return self
     
     def rotate(self, angle):
@@ -1782,6 +1959,33 @@ class ReferenceBase:
 
     def get_dependencies(self, include_elements=False):
         return [self.ref_cell]+self.ref_cell.get_dependencies(include_elements)
+
+    def _place_bbox(self, bbox):
+        """
+        Rotate and translate a bounding box into the frame of this reference
+
+        :param bbox: A magnified bounding box in the frame of the referenced cell
+        :returns: The bounding box in place, modified in place
+        """
+        from . import utils
+
+        if self.rotation:
+            x0,y0=bbox[0]
+            x1,y1=bbox[1]
+            
+            box=np.array([[x0,y0],
+                             [x0,y1],
+                             [x1, y1],
+                             [x1, y0]])            
+            
+            box = utils.rotate(box, self.rotation)
+                        
+            bbox[0]=box.min(0)
+            bbox[1]=box.max(0)        
+        
+        bbox += self.origin
+        
+        return bbox
     
 
 class CellReference(ReferenceBase):
@@ -1872,7 +2076,7 @@ class CellReference(ReferenceBase):
             if by_layer:
                 factor = self.magnification * self.magnification
                 cell_area = self.ref_cell.area(True)
-                for kk in cell_area.iterkeys():
+                for kk in cell_area:
                     cell_area[kk] *= factor
                 return cell_area
             else:
@@ -1888,9 +2092,6 @@ class CellReference(ReferenceBase):
         :returns: Bounding box of this cell [[x_min, y_min], [x_max, y_max]], or
             ``None`` if the cell is empty.
         """
-        from . import utils
-
-        
         if len(self.ref_cell)==0:
             return None
         
@@ -1899,24 +2100,7 @@ class CellReference(ReferenceBase):
         bbox=self.ref_cell.bounding_box
         bbox *= mag
         
-        if self.rotation:
-            x0,y0=bbox[0]
-            x1,y1=bbox[1]
-            
-            box=np.array([[x0,y0],
-                             [x0,y1],
-                             [x1, y1],
-                             [x1, y0]])            
-            
-            box = utils.rotate(box, self.rotation)
-                        
-            bbox[0]=[min(box[:,0]), min(box[:,1])]
-            bbox[1]=[max(box[:,0]), max(box[:,1])]        
-        
-        bbox[0] += self.origin
-        bbox[1] += self.origin        
-        
-        return bbox
+        return self._place_bbox(bbox)
 
     def artist(self):
         """
@@ -1941,11 +2125,7 @@ class CellReference(ReferenceBase):
 
         xform.translate(self.origin[0], self.origin[1])
 
-        artists=self.ref_cell.artist()        
-        for a in artists:
-            a.set_transform(a.get_transform() + xform)
-
-        return artists
+        return _transform_artists(self.ref_cell.artist(), xform)
 
     def flatten(self):
         """
@@ -2077,7 +2257,7 @@ class CellArray(ReferenceBase):
             factor = self.cols * self.rows * self.magnification * self.magnification
         if by_layer:
             cell_area = self.ref_cell.area(True)
-            for kk in cell_area.iterkeys():
+            for kk in cell_area:
                 cell_area[kk] *= factor
             return cell_area
         else:
@@ -2093,8 +2273,6 @@ class CellArray(ReferenceBase):
         :returns: Bounding box of this cell [[x_min, y_min], [x_max, y_max]], or
             ``None`` if the cell is empty.
         """
-        from . import utils
-
         if len(self.ref_cell)==0:
             return None
 
@@ -2107,25 +2285,7 @@ class CellArray(ReferenceBase):
 
         bbox[1] += size
         
-        if self.rotation:
-            x0,y0=bbox[0]
-            x1,y1=bbox[1]
-            
-            box=np.array([[x0,y0],
-                             [x0,y1],
-                             [x1, y1],
-                             [x1, y0]])            
-            
-            box = utils.rotate(box, self.rotation)
-            
-            bbox[0]=[min(box[:,0]), min(box[:,1])]
-            bbox[1]=[max(box[:,0]), max(box[:,1])]
-            
-        
-        bbox[0] += self.origin
-        bbox[1] += self.origin        
-        
-        return bbox
+        return self._place_bbox(bbox)
         
     def artist(self):
         """
@@ -2137,36 +2297,30 @@ class CellArray(ReferenceBase):
         if self.magnification is not None:
             mag=self.magnification
         
-        artists=[]
-        #Magnify the cell and then pattern                
-        for i in range(self.cols):
-            for j in range(self.rows):
-
-                p=np.array([i,j]).dot(self.spacing)
-
-                art=self.ref_cell.artist()        
-
-                trans=matplotlib.transforms.Affine2D()
-                trans.scale(mag)
-                trans.translate(p[0], p[1])
-
-                for a in art:
-                    a.set_transform(a.get_transform() + trans)
-                artists += art
-
         #Rotate and translate the patterned array        
-        trans=matplotlib.transforms.Affine2D()
+        array_trans=matplotlib.transforms.Affine2D()
         if self.x_reflection:
-            trans.scale(1, -1)
+            array_trans.scale(1, -1)
         
         if self.rotation is not None:
-            trans.rotate_deg(self.rotation)
+            array_trans.rotate_deg(self.rotation)
 
         if any(self.origin):            
-            trans.translate(self.origin[0], self.origin[1])
+            array_trans.translate(self.origin[0], self.origin[1])
+
+        #Offsets of every instance in the array, in column order
+        offsets=np.indices((self.cols, self.rows)).reshape(2, -1).T.dot(self.spacing)
 
-        for a in artists:
-            a.set_transform(a.get_transform() + trans)
+        artists=[]
+        #Magnify the cell and then pattern, with one combined transform
+        #per instance
+        for p in offsets:
+            trans=matplotlib.transforms.Affine2D()
+            trans.scale(mag)
+            trans.translate(p[0], p[1])
+            trans=matplotlib.transforms.Affine2D(array_trans.get_matrix().dot(trans.get_matrix()))
+
+            artists.extend(_transform_artists(self.ref_cell.artist(), trans))
 
         return artists
 
@@ -2223,6 +2377,7 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
     The import function returns a Layout containing only top level cells.
     """
 
+    stamp_format = "created %d/%d/%d,%d:%d:%d modified %d/%d/%d,%d:%d:%d"
     record_name = ('HEADER', 'BGNLIB', 'LIBNAME', 'UNITS', 'ENDLIB', 'BGNSTR', 'STRNAME', 'ENDSTR', 'BOUNDARY', 'PATH', 'SREF', 'AREF', 'TEXT', 'LAYER', 'DATATYPE', 'WIDTH', 'XY', 'ENDEL', 'SNAME', 'COLROW', 'TEXTNODE', 'NODE', 'TEXTTYPE', 'PRESENTATION', 'SPACING', 'STRING', 'STRANS', 'MAG', 'ANGLE', 'UINTEGER', 'USTRING', 'REFLIBS', 'FONTS', 'PATHTYPE', 'GENERATIONS', 'ATTRTABLE', 'STYPTABLE', 'STRTYPE', 'ELFLAGS', 'ELKEY', 'LINKTYPE', 'LINKKEYS', 'NODETYPE', 'PROPATTR', 'PROPVALUE', 'BOX', 'BOXTYPE', 'PLEX', 'BGNEXTN', 'ENDTEXTN', 'TAPENUM', 'TAPECODE', 'STRCLASS', 'RESERVED', 'FORMAT', 'MASK', 'ENDMASKS', 'LIBDIRSIZE', 'SRFNAME', 'LIBSECUR')
 
     if infile.__class__ == ''.__class__:
@@ -2231,8 +2386,11 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
     else:
         close = False
 
+    # checked for every record, so only compare once
+    trace = verbose==2
+
     cell_dict = {}
-    emitted_warnings = []
+    emitted_warnings = set()
     rec_typ, data =  _read_record(infile)
     kwargs = {}
     create_element = None
@@ -2240,41 +2398,43 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
     while rec_typ is not None:
         i+=1
         rname = record_name[rec_typ]
-        if verbose==2:       
+        if trace:       
             print(i, ':', rname, end=' ')
 
         # Library Head/Tail
         if 'HEADER' == rname:
-            if verbose==2:
+            if trace:
                 print(data[0], end=' ')
         elif 'BGNLIB' == rname:
-            kwargs['created'] = datetime.datetime(*data.tolist()[:6])
-            kwargs['modified'] = datetime.datetime(*data.tolist()[6:])
-            if verbose==2:
-                print("created %d/%d/%d,%d:%d:%d modified %d/%d/%d,%d:%d:%d" % tuple(data.tolist()), end=' ')
+            stamp = data.tolist()
+            kwargs['created'] = datetime.datetime(*stamp[:6])
+            kwargs['modified'] = datetime.datetime(*stamp[6:])
+            if trace:
+                print(stamp_format % tuple(stamp), end=' ')
         elif 'LIBNAME' == rname:
             kwargs['name'] = data.decode('ascii')
-            if verbose==2:
+            if trace:
                 print(kwargs['name'], end=' ')
         elif 'UNITS' == rname:
             factor = data[0]
             kwargs['precision'] = unit * factor
             kwargs['unit'] = unit
-            if verbose==2:
+            if trace:
                 print(kwargs['unit'], end=' ')
             layout = Layout(**kwargs)
             kwargs={}
         elif 'ENDLIB' == rname:
-            if verbose==2:
+            if trace:
                 print()
             break
 
         # Cell Creation
         elif 'BGNSTR' == rname:
-            kwargs['created'] = datetime.datetime(*data.tolist()[:6])
-            kwargs['modified'] = datetime.datetime(*data.tolist()[6:])
-            if verbose==2:
-                print("created %d/%d/%d,%d:%d:%d modified %d/%d/%d,%d:%d:%d" % tuple(data.tolist()), end=' ')
+            stamp = data.tolist()
+            kwargs['created'] = datetime.datetime(*stamp[:6])
+            kwargs['modified'] = datetime.datetime(*stamp[6:])
+            if trace:
+                print(stamp_format % tuple(stamp), end=' ')
         elif 'STRNAME' == rname:
             if not str is bytes:
                 if data[-1] == 0:
@@ -2285,7 +2445,7 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
             cell = Cell(name, **kwargs)
             kwargs={}
             cell_dict[name] = cell
-            if verbose==2:
+            if trace:
                 print(name, end=' ')
         elif 'ENDSTR' == rname:
             cell = None
@@ -2310,27 +2470,27 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
         # Element Data and Modifiers
         elif 'LAYER' == rname:
             kwargs['layer'] = layers.get(data[0], data[0])
-            if verbose==2:
+            if trace:
                 print(kwargs['layer'], end=' ')
         elif 'DATATYPE' == rname or 'TEXTTYPE' == rname:
             kwargs['datatype'] = datatypes.get(data[0], data[0])
-            if verbose==2:
+            if trace:
                 print(kwargs['datatype'], end=' ')
         elif 'XY'  == rname:
             if 'xy' not in kwargs:
                 kwargs['xy'] = factor * data
             else:
                 kwargs['xy'] = np.hstack((kwargs['xy'], factor * data))
-            if verbose==2:
+            if trace:
                 print(kwargs['xy'], end=' ')
         elif 'WIDTH' == rname:
             kwargs['width'] = factor * abs(data[0])
             if data[0] < 0 and rname not in emitted_warnings:
                 warnings.warn("[GDSPY] Paths with absolute width value are not supported. Scaling these paths will also scale their width.", stacklevel=2)
-                emitted_warnings.append(rname)
+                emitted_warnings.add(rname)
         elif 'PATHTYPE' == rname:
             kwargs['pathtype'] = data[0]
-            if verbose==2:
+            if trace:
                 print(kwargs['pathtype'], end=' ')
         elif 'SNAME' == rname:
             if not str is bytes:
@@ -2339,26 +2499,26 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
                 else:
                     data = data.decode('ascii')
             kwargs['ref_cell'] = rename.get(data, data)
-            if verbose==2:
+            if trace:
                 print(',', kwargs['ref_cell'], end=' ')
         elif 'COLROW' == rname:
             kwargs['cols'] = data[0]
             kwargs['rows'] = data[1]
         elif 'STRANS' == rname:
-            kwargs['x_reflection'] = ((long(data[0]) & 0x8000) > 0)
-            if verbose==2:
+            kwargs['x_reflection'] = ((int(data[0]) & 0x8000) > 0)
+            if trace:
                 print(kwargs['x_reflection'], end=' ')
         elif 'MAG' == rname:
             kwargs['magnification'] = data[0]
-            if verbose==2:
+            if trace:
                 print(kwargs['magnification'], end=' ')
         elif 'ANGLE' == rname:
             kwargs['rotation'] = data[0]
-            if verbose==2:
+            if trace:
                 print(kwargs['rotation'], end=' ')
         elif 'PRESENTATION' == rname:
             kwargs['anchor'] = ['tl', 'tc', 'tr', None, 'cl', 'cc', 'cr', None, 'bl', 'bc', 'br'][data[0]]
-            if verbose==2:
+            if trace:
                 print(kwargs['anchor'], end=' ')
         elif 'STRING' == rname:
             if not str is bytes:
@@ -2368,16 +2528,16 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
                     kwargs['text'] = data.decode('ascii')
             else:
                 kwargs['text'] = data
-            if verbose==2:
+            if trace:
                 print(kwargs['text'], end=' ')
 
         # Not supported
         elif verbose and rname not in emitted_warnings:
             warnings.warn("Record type {0} not supported by GdsImport.".format(rname), stacklevel=2)
-            emitted_warnings.append(rname)
+            emitted_warnings.add(rname)
 
         rec_typ, data =  _read_record(infile)
-        if verbose==2: print('')
+        if trace: print('')
 
     if close:
         infile.close()
@@ -2397,7 +2557,8 @@ def GdsImport(infile, rename={}, layers={}, datatypes={}, verbose=True, unit=1e-
     warnings.filterwarnings('default')
 
     # Remove non-top level cells             
-    for k in [j for j in layout.keys() if j not in [i.name for i in layout.top_level()]]:
+    top_names=set(i.name for i in layout.top_level())
+    for k in [j for j in layout.keys() if j not in top_names]:
         layout.pop(k)
     
     return layout
@@ -2518,7 +2679,7 @@ def _clean_args(cls, kwargs):
     Remove arguments with unknown names from kwargs 
     """
     
-    arg_names = inspect.getargspec(cls.__init__).args
+    arg_names = inspect.getfullargspec(cls.__init__).args
     return {k: kwargs[k] for k in kwargs if k in arg_names}
 
 def _create_polygon(**kwargs):
@@ -2564,6 +2725,8 @@ def _create_array(**kwargs):
     kwargs = _clean_args(CellArray, kwargs)
     return CellArray(**kwargs)
 
+_id_chars=string.ascii_uppercase+string.ascii_lowercase+string.digits+'ab'
+
 def _compact_id(obj):
     """
     Return the id of the object as an ascii string.
@@ -2572,14 +2735,12 @@ def _compact_id(obj):
     in valid GDSII names.
     """
 
-    i=bin(id(obj))[2:]
-    chars=string.ascii_uppercase+string.ascii_lowercase+string.digits+'ab'
+    i=id(obj)
 
     out=''
-    while len(i):
-        s=int(i[-6:], base=2)
-        out+=chars[s]
-        i=i[:-6]
+    while i:
+        out+=_id_chars[i & 0x3f]
+        i >>= 6
         
     return out[::-1]
 
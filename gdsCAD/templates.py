@@ -12,11 +12,12 @@ Templates for automating the design of different wafer styles.
 """
 from __future__ import absolute_import
 
-from .core import (Cell, CellArray, GdsImport, Elements)
+from .core import (Cell, CellArray, CellReference, GdsImport, Elements)
 from .shapes import (Circle, Rectangle, Label)
 from .utils import rotate, translate
 
 import os.path
+import copy
 import math
 import numpy as np
 import numbers
@@ -61,14 +62,13 @@ class Wafer_GridStyle(Cell):
         """
         A list of all active layers in ``cells``
         """
-        cell_layers=set()
+        layer_lists=[]
         for c in self.cells:
             if isinstance(c, Cell):
-                cell_layers |= set(c.get_layers())
+                layer_lists.append(c.get_layers())
             else:
-                for s in c:
-                    cell_layers |= set(s.get_layers())
-        return list(cell_layers)        
+                layer_lists.extend(s.get_layers() for s in c)
+        return list(set().union(*layer_lists))
 
     def add_aligment_marks(self):
         """
@@ -87,23 +87,30 @@ class Wafer_GridStyle(Cell):
         mblock.add(ver, origin=(2000, -1200))
         mblock.add(ver, origin=(2500, -1200))
 
-        for pt in self.align_pts:
-            offset=np.array([3000, 2000]) * np.sign(pt)            
-            self.add(mblock, origin=pt + offset)
+        origins=self.align_pts + np.array([3000, 2000]) * np.sign(self.align_pts)
+        self.extend([CellReference(mblock, origin=o) for o in origins])
 
     def add_orientation_text(self):
         """
         Create Orientation Label
         """
         tblock = Cell('WAF_ORI_TEXT')
+        protos=[]
+        for (t, pt) in self.o_text.items():
+            txt=Label(t, 1000)
+            bbox=txt.bounding_box
+            width=np.array([1,0]) * (bbox[1,0]-bbox[0,0])
+            offset=width * (-1 if pt[0]<0 else 0)
+            txt.translate(np.array(pt) + offset)
+            protos.append(txt)
+
+        texts=[]
         for l in self.cell_layers:
-            for (t, pt) in self.o_text.iteritems():
-                txt=Label(t, 1000, layer=l)
-                bbox=txt.bounding_box
-                width=np.array([1,0]) * (bbox[1,0]-bbox[0,0])
-                offset=width * (-1 if pt[0]<0 else 0)
-                txt.translate(np.array(pt) + offset)
-                tblock.add(txt)
+            for txt in protos:
+                new_txt=txt.copy()
+                new_txt.layer=l
+                texts.append(new_txt)
+        tblock.extend(texts)
         self.add(tblock)
 
     def add_dicing_marks(self):
@@ -114,17 +121,22 @@ class Wafer_GridStyle(Cell):
         width=100./2
         r=self.wafer_r
         rng=np.floor(self.wafer_r/self.block_size).astype(int)
+        xs=np.arange(-rng[0], rng[0]+1)*self.block_size[0]
+        ys=np.arange(-rng[1], rng[1]+1)*self.block_size[1]
+        #extent of each mark where it meets the wafer edge
+        x_ends=np.sqrt(r**2-ys**2)
+        y_ends=np.sqrt(r**2-xs**2)
+
+        #opposite corners of every mark, the same on every layer
+        p0=np.vstack((np.column_stack((xs-width, y_ends)),
+                      np.column_stack((x_ends, ys-width))))
+        p1=np.vstack((np.column_stack((xs+width, -y_ends)),
+                      np.column_stack((-x_ends, ys+width))))
+        corners=list(zip(p0, p1))
+
         dmarks=Cell('DIC_MRKS')
-        for l in self.cell_layers:                
-            for x in np.arange(-rng[0], rng[0]+1)*self.block_size[0]:
-                y=np.sqrt(r**2-x**2)
-                vm=Rectangle((x-width, y), (x+width, -y), layer=l)
-                dmarks.add(vm)
-            
-            for y in np.arange(-rng[1], rng[1]+1)*self.block_size[1]:
-                x=np.sqrt(r**2-y**2)
-                hm=Rectangle((x, y-width), (-x, y+width), layer=l)
-                dmarks.add(hm)
+        dmarks.extend([Rectangle(a, b, layer=l)
+                       for l in self.cell_layers for (a, b) in corners])
         self.add(dmarks)
 
     def add_wafer_outline(self):        
@@ -143,6 +155,9 @@ class Wafer_GridStyle(Cell):
         Create blocks and add them to he wafer Cell
         """
         self.manifest=''
+        refs=[]
+        #blocks of this wafer on the same layers share their alignment marks
+        marks={}
         for (i, pt) in enumerate(self.block_pts):
             cell=self.cells[i % len(self.cells)]
             origin = pt*self.block_size
@@ -155,15 +170,17 @@ class Wafer_GridStyle(Cell):
                     spacing = cell.spacing
                 except AttributeError:
                     spacing = None
-                block=Block(cell_name, cell, self.block_size, edge_gap=self.edge_gap, prefix=prefix+'_', spacing = spacing)
+                block=Block(cell_name, cell, self.block_size, edge_gap=self.edge_gap, prefix=prefix+'_', spacing = spacing, marks_cache=marks)
                 self.manifest+='%2d\t%s\t%s\t(%.2f, %.2f)\n' % ((i, prefix, cell.name)+tuple(origin))
 
             else:
                 cell_name=prefix + cell[0].name
-                block=RangeBlock_1D(cell_name, cell, self.block_size, edge_gap=self.edge_gap, prefix=prefix+'_')
+                block=RangeBlock_1D(cell_name, cell, self.block_size, edge_gap=self.edge_gap, prefix=prefix+'_', marks_cache=marks)
                 self.manifest+='%2d\t%s\t%s\t(%.2f, %.2f)\n' % ((i, prefix, cell[0].name)+tuple(origin))
 
-            self.add(block, origin=origin)
+            refs.append(CellReference(block, origin=origin))
+
+        self.extend(refs)
 
     def _place_blocks(self):
         """
@@ -192,7 +209,7 @@ class Wafer_GridStyle(Cell):
             ys.add(p[1])
 
         xs=sorted(list(xs))
-        self.blockcols=dict(zip(xs, [string.uppercase[i] for i,x in enumerate(xs)]))
+        self.blockcols=dict(zip(xs, [string.ascii_uppercase[i] for i,x in enumerate(xs)]))
         ys=sorted(list(ys))
         self.blockrows=dict(zip(ys, [string.digits[i] for i,y in enumerate(ys)]))
                 
@@ -206,12 +223,11 @@ class Wafer_GridStyle(Cell):
         else:
             self._label.elements=[]
         
-        for l in self._cell_layers():
-            txt=Label(label, 1000, layer=l)
-            bbox=txt.bounding_box
-            offset=np.array([0,2]) * self.block_size - bbox[0] + 200
-            txt.translate(offset)        
-            self._label.add(txt)
+        txt=Label(label, 1000)
+        bbox=txt.bounding_box
+        offset=np.array([0,2]) * self.block_size - bbox[0] + 200
+        txt.translate(offset)        
+        self._label.extend(_layer_copies(txt, self.cell_layers))
 
 class Wafer_Style1(Wafer_GridStyle):
     """
@@ -297,13 +313,15 @@ class Block(Cell):
     :param edge_gap: distance to leave around the perimeter of the block
     :param prefix: A string to add to the beginning of the cell name used for the
         printed label, the address of the block location.
+    :param marks_cache: A dict in which to share the alignment mark cell with other
+        blocks on the same layers. When omitted the block gets its own cell.
 
     A block contains two alignment mark clusters (alignment marks + verniers)
     at the bottom corners, a label based on the cell name, and a grid of many
     copies of the cell.
     """
     def __init__(self, name, cell, size,
-                 spacing=None, edge_gap=0, prefix=''):
+                 spacing=None, edge_gap=0, prefix='', marks_cache=None):
 
         Cell.__init__(self, name)
         size=np.asarray(size)
@@ -311,12 +329,7 @@ class Block(Cell):
         d_layers=cell_layers
 
         #Create alignment marks
-        styles=['A' if i%2 else 'C' for i in range(len(d_layers))]            
-        am = AlignmentMarks(styles, d_layers)
-        ver = Verniers(styles, d_layers)
-        for e in ver.elements:
-            e.translate((310,-150))
-            am.add(e)
+        am = _block_marks(d_layers, marks_cache)
         am_bbox = am.bounding_box
         am_size = am_bbox[1]-am_bbox[0]
 
@@ -324,11 +337,10 @@ class Block(Cell):
         self.add(CellArray(am, 2, 1, sp, -am_bbox[0]+0.5*edge_gap))
         
         #Create text
-        for l in d_layers:
-            text=Label(prefix+cell.name, 150, (am_size[0]+edge_gap, +edge_gap), layer=l)
-            bbox=text.bounding_box
-            t_width = bbox[1,0]-bbox[0,0]
-            self.add(text)        
+        text=Label(prefix+cell.name, 150, (am_size[0]+edge_gap, +edge_gap))
+        self.extend(_layer_copies(text, d_layers))
+        bbox=text.bounding_box
+        t_width = bbox[1,0]-bbox[0,0]
         
         bbox = cell.bounding_box
         corner=bbox[0]  
@@ -339,30 +351,35 @@ class Block(Cell):
             spacing= bbox*(1.5)        
 
         
-        self.N=0
+        regions=[]
+        inner = size - 2*edge_gap
+        am_rows = np.ceil(am_size[1]/spacing[1])
 
         # upper area
-        cols=np.floor((size[0]-2*edge_gap + spacing[0])/spacing[0])
-        rows=np.floor((size[1]-am_size[1]-2*edge_gap)/spacing[1])       
+        cols=np.floor((inner[0] + spacing[0])/spacing[0])
+        rows=np.floor((inner[1]-am_size[1])/spacing[1])       
 
-        origin = np.ceil((am_size[1])/spacing[1])\
-                    * spacing * np.array([0,1]) + edge_gap - corner
+        origin = am_rows * spacing * np.array([0,1]) + edge_gap - corner
 
-        ar=CellArray(cell, cols, rows, spacing, origin)
-        self.add(ar)
-        self.N+=rows*cols
+        regions.append((cols, rows, origin))
 
         # lower area
-        cols=np.floor((size[0]-2*am_size[0]-t_width-2*edge_gap)/spacing[0])
-        rows=np.ceil(am_size[1]/spacing[1])       
+        cols=np.floor((inner[0]-2*am_size[0]-t_width)/spacing[0])
+        rows=am_rows
 
         origin = np.ceil((am_size[0]+t_width)/spacing[0])\
                     * spacing * np.array([1,0]) + edge_gap - corner
 
+        regions.append((cols, rows, origin))
 
-        ar=CellArray(cell, cols, rows, spacing, origin)
-        self.add(ar)
-        self.N+=rows*cols
+        # one array per non-empty region
+        self.N=0
+        arrays=[]
+        for (cols, rows, origin) in regions:
+            if cols>0 and rows>0:
+                arrays.append(CellArray(cell, cols, rows, spacing, origin))
+                self.N+=rows*cols
+        self.extend(arrays)
 
 class RangeBlock_1D(Cell):
     """
@@ -376,39 +393,32 @@ class RangeBlock_1D(Cell):
     :param edge_gap: distance to leave around the perimeter of the block
     :param prefix: A string to add to the beginning of the cell name used for the
         printed label, the address of the block location.
+    :param marks_cache: A dict in which to share the alignment mark cell with other
+        blocks on the same layers. When omitted the block gets its own cell.
 
     A block contains two alignment mark clusters (alignment marks + verniers)
     at the bottom corners, a label based on the cell name, and a grid of many
     copies of the cell.
 
     """
-    def __init__(self, name, cells, size, edge_gap=0, prefix=''):
+    def __init__(self, name, cells, size, edge_gap=0, prefix='', marks_cache=None):
 
         Cell.__init__(self, name)
         size=np.asarray(size)
-        cell_layers=set()
-        for c in cells:
-            cell_layers |= set(c.get_layers())
-        cell_layers=list(cell_layers)
+        cell_layers=list(set().union(*(c.get_layers() for c in cells)))
         d_layers=cell_layers
 
         #Create alignment marks
-        styles=['A' if i%2 else 'C' for i in range(len(d_layers))]            
-        am = AlignmentMarks(styles, d_layers)
-        ver = Verniers(styles, d_layers)
-        for e in ver.elements:
-            e.translate((310,-150))
-            am.add(e)
+        am = _block_marks(d_layers, marks_cache)
         am_bbox=am.bounding_box
-        am_size=np.array([am_bbox[1,0]-am_bbox[0,0], am_bbox[1,1]-am_bbox[0,1]])
+        am_size=am_bbox[1]-am_bbox[0]
 
         sp=size - am_size - edge_gap
         self.add(CellArray(am, 2, 1, sp, -am_bbox[0]+0.5*edge_gap))
         
         #Create text
-        for l in d_layers:
-            text=Label(prefix+cells[0].name, 150, (am_size[0]+edge_gap, +edge_gap), layer=l)
-            self.add(text)        
+        text=Label(prefix+cells[0].name, 150, (am_size[0]+edge_gap, +edge_gap))
+        self.extend(_layer_copies(text, d_layers))
         bbox=text.bounding_box
         t_width = bbox[1,0]-bbox[0,0]
 
@@ -418,7 +428,7 @@ class RangeBlock_1D(Cell):
         for c in cells:
             bbox=c.bounding_box
             corners.append(bbox[0])
-            bbox = np.array([bbox[1][0]-bbox[0][0], bbox[1][1]-bbox[0][1]])          
+            bbox = bbox[1]-bbox[0]
             spacings.append(bbox*1.5)
             widths.append((bbox*1.5)[0])
         
@@ -443,6 +453,45 @@ class RangeBlock_1D(Cell):
             origin += s[0] * n *np.array([1,0])
 
 
+def _layer_copies(obj, layers):
+    """
+    Copies of ``obj``, one moved onto each layer in ``layers``.
+
+    Copying is much cheaper than rebuilding geometry such as a :class:`Label`
+    from the font for every layer.
+    """
+    copies=[]
+    for l in layers:
+        new_obj=obj.copy()
+        new_obj.layer=l
+        copies.append(new_obj)
+    return copies
+
+
+def _block_marks(layers, cache=None):
+    """
+    The alignment mark cluster (alignment marks + verniers) placed in the
+    bottom corners of a block.
+
+    :param layers: The layers to draw the marks on
+    :param cache: A dict, usually local to one wafer, of the clusters already
+        built. Blocks on the same layers then share a single cell.
+    """
+    key=tuple(layers)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    styles=['A' if i%2 else 'C' for i in range(len(layers))]            
+    am = AlignmentMarks(styles, layers)
+    ver = Verniers(styles, layers)
+    for e in ver.elements:
+        e.translate((310,-150))
+    am.extend(ver.elements)
+    if cache is not None:
+        cache[key]=am
+    return am
+
+
 def _divide_cols(l, widths):
     """
     Attempt to evenly divide the number of cols.
@@ -526,6 +575,44 @@ class StripArray(Elements):
         Elements.__init__(self, polys, layer, datatype)
        
 
+_gds_cache={}
+
+def _load_gds(fname):
+    """
+    Import a layout from the resources directory, parsing each file only once.
+
+    The returned Layout is shared between callers and must not be modified.
+    """
+    try:
+        return _gds_cache[fname]
+    except KeyError:
+        pass
+
+    path,_=os.path.split(__file__)
+    imp=GdsImport(os.path.join(path, 'resources', fname))
+    _gds_cache[fname]=imp
+    return imp
+
+_by_layer_cache={}
+
+def _load_by_layer(fname, cell_name):
+    """
+    The elements of a resource cell grouped into lists keyed by layer.
+
+    The element lists are shared between callers and must not be modified.
+    """
+    key=(fname, cell_name)
+    try:
+        return _by_layer_cache[key]
+    except KeyError:
+        pass
+
+    by_layer={}
+    for e in _load_gds(fname)[cell_name].elements:
+        by_layer.setdefault(e.layer, []).append(e)
+    _by_layer_cache[key]=by_layer
+    return by_layer
+
 def AlignmentMarks(styles, layers=1):
     """
     Create alignment marks.
@@ -559,17 +646,16 @@ def AlignmentMarks(styles, layers=1):
 
     cell=Cell('CONT_ALGN')
 
-    path,_=os.path.split(__file__)
-    fname=os.path.join(path, 'resources', 'ALIGNMENT.GDS')
-    imp=GdsImport(fname)
+    by_layer=_load_by_layer('ALIGNMENT.GDS', 'CONTACTALIGN')
 
+    new_els=[]
     for (s,l) in zip(styles, layers):
-        style=styles_dict[s]
-        for e in imp['CONTACTALIGN'].elements:
-            if e.layer==style:
-                new_e=e.copy()
-                new_e.layer=l
-                cell.add(new_e)
+        # copy each style's elements in one pass; a fresh memo per entry keeps
+        # repeated styles on different layers independent
+        for new_e in copy.deepcopy(by_layer.get(styles_dict[s], [])):
+            new_e.layer=l
+            new_els.append(new_e)
+    cell.extend(new_els)
 
     return cell
 
@@ -604,16 +690,15 @@ def Verniers(styles, layers=1):
 
     cell=Cell('VERNIERS')
 
-    path,_=os.path.split(__file__)
-    fname=os.path.join(path, 'resources', 'ALIGNMENT.GDS')
-    imp=GdsImport(fname)
+    by_layer=_load_by_layer('ALIGNMENT.GDS', 'VERNIERS')
 
+    new_els=[]
     for (s,l) in zip(styles, layers):
-        style=styles_dict[s]
-        for e in imp['VERNIERS'].elements:
-            if e.layer==style:
-                new_e=e.copy()
-                new_e.layer=l
-                cell.add(new_e)
+        # copy each style's elements in one pass; a fresh memo per entry keeps
+        # repeated styles on different layers independent
+        for new_e in copy.deepcopy(by_layer.get(styles_dict[s], [])):
+            new_e.layer=l
+            new_els.append(new_e)
+    cell.extend(new_els)
 
     return cell
@@ -15,9 +15,19 @@ from __future__ import print_function
 from __future__ import absolute_import
 
 
+import copy
+import logging
 import numpy as np
 from .core import (Cell, CellReference, CellArray,
-                  ElementBase, Elements, ReferenceBase)
+                  ElementBase, Boundary, Path, Elements, ReferenceBase,
+                  _invariant_point)
+
+try:
+    import pyclipper
+except ImportError:
+    pyclipper = None
+
+log = logging.getLogger(__name__)
 
 def translate(obj, displacement):
     """
@@ -34,7 +44,7 @@ def translate(obj, displacement):
         obj.translate(displacement)
         return obj
 
-    return np.array(obj)+np.array(displacement)
+    return np.asarray(obj)+np.asarray(displacement)
 
 
 def rotate(obj, theta, center=(0,0)):
@@ -51,16 +61,25 @@ def rotate(obj, theta, center=(0,0)):
         obj.rotate(theta, center)
         return obj
 
-    pts=np.array(obj)
+    pts=np.asarray(obj)
     ang = theta * np.pi/180
-    m=np.array([[np.cos(ang), -np.sin(ang)], [np.sin(ang), np.cos(ang)]])
 
-    if isinstance(center, str) and center.lower()=='com':
-        center=pts.mean(0)
-    else:    
-        center=np.array(center)
+    center=_invariant_point(pts, center)
+
+    rel=np.ascontiguousarray(pts-center, dtype=np.float64)
+    if rel.ndim==0 or rel.shape[-1]!=2:
+        (c, s)=(np.cos(ang), np.sin(ang))
+        m=np.array([[c, -s], [s, c]])
+        return m.dot(rel.T).T+center
 
-    return m.dot((np.array(pts)-center).T).T+center
+    # treat each (x, y) pair as x+iy and rotate by a single complex multiply
+    z=rel.view(np.complex128)
+    z*=np.exp(1j*ang)
+    rel+=center
+    return rel
+
+_reflect_x=np.array([1,-1])
+_reflect_y=np.array([-1,1])
 
 def reflect(obj, axis, origin=(0,0), reverse_seq=True):
     """
@@ -83,12 +102,20 @@ def reflect(obj, axis, origin=(0,0), reverse_seq=True):
 
 
     if axis=='x':
-        return scale(obj, [1,-1], origin, reverse_seq)
+        k=_reflect_x
     elif axis=='y':
-        return scale(obj, [-1,1], origin, reverse_seq)
+        k=_reflect_y
     else:
         raise ValueError('Unknown axis %s'%str(axis))
 
+    # equivalent to scale(obj, k, origin, reverse_seq) for a 2D factor k
+    pts=np.asarray(obj)
+    origin=_invariant_point(pts, origin)
+
+    out=(pts-origin)*k
+    out+=origin
+    return out if reverse_seq else out[::-1]
+
 
 def scale(obj, k, origin=(0,0), reverse_seq=True):
     """
@@ -114,18 +141,45 @@ def scale(obj, k, origin=(0,0), reverse_seq=True):
         obj.scale(k, origin)
         return obj
 
-    pts=np.array(obj)
-    if isinstance(origin, str) and origin.lower()=='com':
-        origin=pts.mean(0)
-    else:    
-        origin=np.array(origin)
+    pts=np.asarray(obj)
+    origin=_invariant_point(pts, origin)
         
-    k=np.array(k)
+    k=np.asarray(k)
     
+    # the product already has the widest dtype, so origin is added in place
+    out=(pts-origin)*k
+    out+=origin
+
     if reverse_seq and ((k.prod()>=0) or k.shape==(2,)): #even parity or single point
-        return (pts-origin)*k+origin
+        return out
     else:
-        return ((pts-origin)*k+origin)[::-1]
+        return out[::-1]
+
+
+def _unique_cells(cell):
+    """
+    A list of ``cell`` and every cell it references, each appearing once.
+    """
+    cells=[]
+    seen=set()
+    for c in [cell]+cell.get_dependencies():
+        if id(c) not in seen:
+            seen.add(id(c))
+            cells.append(c)
+    return cells
+
+
+def _empty_copy(cell):
+    """
+    A copy of ``cell`` with all of its elements and references removed.
+
+    Equivalent to copying ``cell``, removing all of its artwork and pruning it,
+    without copying the hierarchy first.
+    """
+    empty=copy.copy(cell)
+    empty._objects=[]
+    empty._references=[]
+    return copy.deepcopy(empty)
 
 
 def split_layers(cell, old_layers):
@@ -146,46 +200,74 @@ def split_layers(cell, old_layers):
     is maintained, however any empty ``Cells`` or references are removed.
 
     """
-    
-    subA=cell.copy()
-    subB=cell.copy()
+    old_layers=frozenset(old_layers)
+
+    #when all art falls on one side, only that side needs a full copy
+    used=set(cell.get_layers())
+    if used.isdisjoint(old_layers):
+        subA=cell.copy()
+        subA.prune()
+        return (subA, _empty_copy(cell))
+    if used <= old_layers:
+        subB=cell.copy()
+        subB.prune()
+        return (_empty_copy(cell), subB)
+
+    subA, subB=_split_walk(cell, old_layers)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug('Split %d cells', len(_unique_cells(subA)))
 
-    #identify all art in subA that should be removed        
-    blacklist=set()
-    deps=subA.get_dependencies(True)
-    print('DEPENDENCY LIST HAS LENGTH: ',len(deps))
-    for e in deps:
-        if not isinstance(e, (Cell, CellReference, CellArray)):
-            if e.layer in old_layers:
-                blacklist.add(e)
-
-    #remove references to removed art
-    for c in [subA]+deps:
-        if isinstance(c, Cell):
-            c._objects=[e for e in c.objects if e not in blacklist]
-    
     #clean heirarchy
     subA.prune()
-            
-    #identify all art in subB that should be removed        
-    blacklist=set()
-    deps=subB.get_dependencies(True)
-    for e in deps:
-        if not isinstance(e, (Cell, CellReference, CellArray)):
-            if e.layer not in old_layers:
-                blacklist.add(e)
-
-    #remove references to removed art
-    for c in [subB]+deps:
-        if isinstance(c, Cell):
-            c._objects=[e for e in c.objects if e not in blacklist]
-            
-    #clean heirarchy
     subB.prune()
     
     return (subA, subB)
 
 
+def _split_walk(cell, old_layers):
+    """
+    Partition a copy of the hierarchy of ``cell`` by layer.
+
+    :param cell: The :class:`Cell` to split
+    :param old_layers: A set of layers whose artwork goes to the second copy
+    :returns: A tuple of two unpruned cells
+
+    ``cell`` is deep copied once. The art on ``old_layers`` is then moved out
+    of that copy into a structural copy of it, so no element is copied twice.
+    Any other attributes of each ``Cell``, such as those of a subclass, are
+    deep copied into the second copy, with references to cells of the first
+    copy pointing at their counterparts in the second.
+    """
+    subA=cell.copy()
+    cells=_unique_cells(subA)
+
+    #the memo maps every cell of the first copy onto its shell in the second
+    memo={}
+    for c in cells:
+        memo[id(c)]=copy.copy(c)
+
+    for c in cells:
+        shell=memo[id(c)]
+        for (k, v) in c.__dict__.items():
+            if k not in ('_objects', '_references'):
+                shell.__dict__[k]=copy.deepcopy(v, memo)
+
+        keep=[]
+        moved=[]
+        for e in c._objects:
+            (moved if e.layer in old_layers else keep).append(e)
+
+        shell._objects=moved
+        if moved:
+            c._objects=keep
+
+    #point the copied references at the new cells
+    for c in cells:
+        memo[id(c)]._references=[copy.deepcopy(r, memo) for r in c._references]
+
+    return (subA, memo[id(subA)])
+
+
 def relayer(cell, old_layers, new_layer):
     """
     Move any elements in old_layers to new_layer
@@ -198,6 +280,7 @@ def relayer(cell, old_layers, new_layer):
     TODO: use same labelling scheme found in GdsImport
     """
     new_cell=cell.copy()
+    old_layers=frozenset(old_layers)
 
     #change layer of art
     for e in new_cell.get_dependencies(True):        
@@ -234,67 +317,355 @@ def chop(polygon, position, axis):
         the second, the polygons left after that position.
     """
     out_polygons = ([], [])
-    polygon = list(polygon)
-    while polygon[-1][axis] == position:
-        polygon = [polygon[-1]] + polygon[:-1]
-    cross = list(numpy.sign(numpy.array(polygon)[:, axis] - position))
-    bnd = ([], [])
-    i = 0
-    while i < len(cross):
-        if cross[i - 1] * cross[i] < 0:
-            if axis == 0:
-                polygon.insert(i, [position, polygon[i - 1][1] + (position - polygon[i - 1][0]) * float(polygon[i][1] - polygon[i - 1][1]) / (polygon[i][0] - polygon[i - 1][0])])
-            else:
-                polygon.insert(i, [polygon[i - 1][0] + (position - polygon[i - 1][1]) * float(polygon[i][0] - polygon[i - 1][0]) / (polygon[i][1] - polygon[i - 1][1]), position])
-            cross.insert(i, 0)
-            bnd[1 * (cross[i + 1] > 0)].append(i)
-            i += 2
-        elif cross[i] == 0:
-            j = i + 1
-            while cross[j] == 0:
-                j += 1
-            if cross[i - 1] * cross[j] < 0:
-                bnd[1 * (cross[j] > 0)].append(j - 1)
-            i = j + 1
-        else:
-            i += 1
-    if len(bnd[0]) == 0:
-        out_polygons[1 * (numpy.sum(cross) > 0)].append(polygon)
+    #no copy yet, the pieces of a straddling polygon are built from new arrays
+    polygon = np.asarray(polygon, dtype=np.float64)
+    #a polygon that does not straddle the line is returned whole
+    if polygon[:, axis].max() <= position:
+        return ([polygon.copy()], [])
+    if polygon[:, axis].min() >= position:
+        return ([], [polygon.copy()])
+    #rotate once so that the last vertex is not on the slicing line
+    shift = np.argmin(polygon[::-1, axis] == position)
+    if shift:
+        polygon = np.roll(polygon, shift, axis=0)
+    above = polygon[:, axis] > position
+    below = polygon[:, axis] < position
+    #neighbours of each vertex, indexing is much cheaper than np.roll on
+    #the few vertices of a typical polygon
+    prv = np.arange(-1, len(polygon) - 1)
+    fwd = np.arange(1, len(polygon) + 1) % len(polygon)
+    #edges that cross the slicing line get a new vertex on it
+    hit = np.nonzero((above & below[prv]) | (below & above[prv]))[0]
+    inserted = hit + np.arange(len(hit))
+    p0 = polygon[hit - 1]
+    p1 = polygon[hit]
+    pts = np.empty((len(hit), 2))
+    pts[:, axis] = position
+    pts[:, 1 - axis] = p0[:, 1 - axis] + (position - p0[:, axis]) * (p1[:, 1 - axis] - p0[:, 1 - axis]) / (p1[:, axis] - p0[:, axis])
+    #runs of vertices on the line that pass from one side to the other
+    on = ~(above | below)
+    first = np.nonzero(on & ~on[prv])[0]
+    after = np.nonzero(on & ~on[fwd])[0] + 1
+    after = after[(above[first - 1] & below[after]) | (below[first - 1] & above[after])]
+    #boundary vertices in the order they appear around the new polygon
+    bnd = np.concatenate((inserted,
+                          after - 1 + np.searchsorted(hit, after - 1, 'right')))
+    upper = np.concatenate((above[hit], above[after]))
+    new = np.empty((len(polygon) + len(hit), 2))
+    new[np.arange(len(polygon)) + np.searchsorted(hit, np.arange(len(polygon)), 'right')] = polygon
+    new[inserted] = pts
+    polygon = new
+    order = np.argsort(bnd)
+    bnd = (bnd[order][~upper[order]], bnd[order][upper[order]])
+    if len(bnd[0]) == 1:
+        #a single pair of boundary vertices (e.g. any convex polygon) splits
+        #the polygon in two without walking it
+        (b0, b1) = sorted((bnd[0][0], bnd[1][0]))
+        side = 1 * (b0 == bnd[1][0])
+        out_polygons[side].append(polygon[b0:b1 + 1])
+        out_polygons[1 - side].append(np.concatenate((polygon[b1:], polygon[:b0 + 1])))
         return out_polygons
-    bnd = (numpy.array(bnd[0]), numpy.array(bnd[1]))
-    bnd = (list(bnd[0][numpy.argsort(numpy.array(polygon)[bnd[0], 1 - axis])]),
-           list(bnd[1][numpy.argsort(numpy.array(polygon)[bnd[1], 1 - axis])]))
-    cross = numpy.ones(len(polygon), dtype=int)
+    bnd = (bnd[0][np.argsort(polygon[bnd[0], 1 - axis])],
+           bnd[1][np.argsort(polygon[bnd[1], 1 - axis])])
+    #walk state of each vertex: 1 unvisited, 2 unvisited on the line,
+    #0 visited, and -2/-1 for boundary vertices of either side
+    cross = np.ones(len(polygon), dtype=np.int8)
+    cross[polygon[:, axis] == position] = 2
     cross[bnd[0]] = -2
     cross[bnd[1]] = -1
+    #position of each boundary vertex in its sorted list
+    bnd_pos = np.full(len(polygon), -1, dtype=int)
+    bnd_pos[bnd[0]] = np.arange(len(bnd[0]))
+    bnd_pos[bnd[1]] = np.arange(len(bnd[1]))
     i = 0
     while i < len(polygon):
-        if cross[i] > 0 and polygon[i][axis] != position:
+        if cross[i] == 1:
             start = i
             side = 1 * (polygon[i][axis] > position)
-            out_polygons[side].append([polygon[i]])
+            #collect the vertex indices, then gather the piece in one go
+            piece = [i]
             cross[i] = 0
             nxt = i + 1
             if nxt == len(polygon):
                 nxt = 0
             boundary = True
             while nxt != start:
-                out_polygons[side][-1].append(polygon[nxt])
+                piece.append(nxt)
                 if cross[nxt] > 0:
                     cross[nxt] = 0
                 if cross[nxt] < 0 and boundary:
-                    j = bnd[cross[nxt] + 2].index(nxt)
-                    nxt = bnd[-cross[nxt] - 1][j]
+                    nxt = bnd[-cross[nxt] - 1][bnd_pos[nxt]]
                     boundary = False
                 else:
                     nxt += 1
                     if nxt == len(polygon):
                         nxt = 0
                     boundary = True
+            out_polygons[side].append(polygon[piece])
         i += 1
     return out_polygons
 
 
+_operand_types = ((Boundary, 'boundary'), (ElementBase, 'element'),
+                  (Elements, 'elements'), ((CellReference, CellArray), 'reference'))
+_operand_kinds = {}
+
+def _operand_kind(obj):
+    """
+    Classify an operand of :func:`slice` or :func:`boolean`.
+
+    The isinstance checks are made once per class and the result is cached.
+    Anything that is not a gdsCAD object is taken to be a list of points.
+    """
+    cls = obj.__class__
+    try:
+        return _operand_kinds[cls]
+    except KeyError:
+        pass
+
+    kind = 'points'
+    for (types, k) in _operand_types:
+        if isinstance(obj, types):
+            kind = k
+            break
+    _operand_kinds[cls] = kind
+    return kind
+
+
+def _operand_polygons(obj):
+    """
+    The vertex arrays of the polygons making up an operand of :func:`slice`
+    or :func:`boolean`.
+
+    References are flattened, and only their boundaries and paths are kept.
+    A path is replaced by the outline of its full width.
+    """
+    kind = _operand_kind(obj)
+    if kind == 'boundary':
+        return [obj.points]
+    elif kind == 'element':
+        return _path_outline(obj) if isinstance(obj, Path) else [obj.points]
+    elif kind == 'elements':
+        elements = obj
+    elif kind == 'reference':
+        elements = obj.flatten()
+    else:
+        return [obj]
+
+    polygons = []
+    for e in elements:
+        if isinstance(e, Boundary):
+            polygons.append(e.points)
+        elif isinstance(e, Path):
+            polygons.extend(_path_outline(e))
+    return polygons
+
+
+def _path_outline(path):
+    """
+    The outline of a :class:`Path` as a list of polygons without holes.
+
+    The path is offset by half its width with Clipper, using the end style of
+    its pathtype and mitred joins.
+    """
+    if pyclipper is None:
+        raise ImportError('pyclipper is needed to take the outline of a Path')
+    try:
+        end_type = _clipper_end_types[path.pathtype]
+    except KeyError:
+        raise ValueError('Outlines of paths with pathtype %d are not supported' % path.pathtype)
+
+    delta = path.width / 2. * _clipper_scale
+    offset = pyclipper.PyclipperOffset(miter_limit=Path._mitre_limit,
+                                       arc_tolerance=1e-3 * delta)
+    offset.AddPath(np.rint(np.asarray(path.points, dtype=np.float64) * _clipper_scale).astype(np.int64),
+                   pyclipper.JT_MITER, end_type)
+    result = []
+    _clipper_outlines(offset.Execute2(delta), result)
+    return [np.array(pts) / _clipper_scale for pts in result]
+
+
+_clipper_scale = 2.**30
+_clipper_types = {}
+if pyclipper is not None:
+    #the incidence table over (0, 0), (1, 0), (0, 1), (1, 1) for each
+    #operation and whether the operands should be swapped
+    _clipper_types = {(False, True, True, True): (pyclipper.CT_UNION, False),
+                      (False, False, False, True): (pyclipper.CT_INTERSECTION, False),
+                      (False, True, False, False): (pyclipper.CT_DIFFERENCE, False),
+                      (False, False, True, False): (pyclipper.CT_DIFFERENCE, True),
+                      (False, True, True, False): (pyclipper.CT_XOR, False)}
+    #the end style of the outline of each pathtype
+    _clipper_end_types = {0: pyclipper.ET_OPENBUTT,
+                          1: pyclipper.ET_OPENROUND,
+                          2: pyclipper.ET_OPENSQUARE}
+
+def _clipper_type(operation, n):
+    """
+    Find the Clipper operation equivalent to a :func:`boolean` operation.
+
+    :param operation: The operation passed to :func:`boolean`
+    :param n: The number of operands
+    :returns: A tuple of the Clipper clip type and whether to swap the
+        operands, or None if Clipper is unavailable or cannot do it
+
+    ``operation`` is probed with incidences of 0, 1 and 2, and must only
+    depend on whether each operand is present.
+    """
+    if not _clipper_types or n not in (1, 2):
+        return None
+
+    probe = [0, 1, 2]
+    table = {}
+    for a in probe:
+        for b in (probe if n == 2 else [0]):
+            table[(a, b)] = bool(operation(a, b) if n == 2 else operation(a))
+    if any(table[(a, b)] != table[(min(a, 1), min(b, 1))] for (a, b) in table):
+        return None
+
+    if n == 1:
+        #a single operand is merged with itself
+        key = (table[(0, 0)], table[(1, 0)], table[(1, 0)], table[(1, 0)])
+    else:
+        key = (table[(0, 0)], table[(1, 0)], table[(0, 1)], table[(1, 1)])
+    return _clipper_types.get(key)
+
+def _clipper_clip(polygons, indices, clip_type):
+    """
+    Clip the operands of :func:`boolean` with Clipper.
+
+    :param polygons: The polygons of all the operands
+    :param indices: The first polygon of each operand, followed by the total
+    :param clip_type: The result of :func:`_clipper_type`
+    :returns: A list of polygons, or None if the result is empty
+    """
+    (clip_type, swap) = clip_type
+    operands = [polygons[indices[i]:indices[i + 1]] for i in range(len(indices) - 1)]
+    if swap:
+        operands.reverse()
+
+    clipper = pyclipper.Pyclipper()
+    for (pts, poly_type) in zip(operands, (pyclipper.PT_SUBJECT, pyclipper.PT_CLIP)):
+        if pts:
+            paths = [np.rint(np.asarray(p, dtype=np.float64) * _clipper_scale).astype(np.int64) for p in pts]
+            #every polygon counts as inside, whichever way it winds
+            paths = [p if pyclipper.Orientation(p) else p[::-1] for p in paths]
+            clipper.AddPaths(paths, poly_type, True)
+    tree = clipper.Execute2(clip_type, pyclipper.PFT_NONZERO, pyclipper.PFT_NONZERO)
+    result = []
+    _clipper_outlines(tree, result)
+    if not result:
+        return None
+    return [np.array(pts) / _clipper_scale for pts in result]
+
+def _clipper_outlines(node, out):
+    """
+    Collect the polygons of a Clipper PyPolyNode tree as polygons without holes.
+
+    :param node: The tree, or a hole within it
+    :param out: The list to which the contours are appended
+
+    GDSII boundaries cannot have holes. An outer contour that encloses holes
+    is cut into vertical strips through the middle of each hole, which opens
+    every hole onto the edge of a strip. Islands inside holes are collected
+    in turn.
+    """
+    for outer in node.Childs:
+        holes = [hole.Contour for hole in outer.Childs]
+        if not holes:
+            out.append(outer.Contour)
+        else:
+            contour = np.array(outer.Contour)
+            (x0, y0) = contour.min(0) - 1
+            (x1, y1) = contour.max(0) + 1
+            cuts = set()
+            for hole in holes:
+                hole = np.array(hole)
+                cuts.add((int(hole[:, 0].min()) + int(hole[:, 0].max())) // 2)
+            edges = [x0] + sorted(cuts) + [x1]
+            for (a, b) in zip(edges[:-1], edges[1:]):
+                clipper = pyclipper.Pyclipper()
+                clipper.AddPaths([outer.Contour] + holes, pyclipper.PT_SUBJECT, True)
+                clipper.AddPath([(a, y0), (b, y0), (b, y1), (a, y1)], pyclipper.PT_CLIP, True)
+                _clipper_outlines(clipper.Execute2(pyclipper.CT_INTERSECTION,
+                                                   pyclipper.PFT_EVENODD,
+                                                   pyclipper.PFT_EVENODD), out)
+        for hole in outer.Childs:
+            _clipper_outlines(hole, out)
+
+
+def _fracture(polygons, max_points):
+    """
+    Split polygons until none of them has more than ``max_points`` vertices.
+
+    Each polygon that is too large is chopped across the longer side of its
+    bounding box, at the median vertex coordinate, and the pieces are checked
+    again. If that cut leaves a piece as large as the polygon, the middle of
+    the bounding box and then the shorter side are tried instead. A polygon
+    that no cut shrinks is kept as it is. Nothing is done if ``max_points`` is
+    4 or less.
+    """
+    out = []
+    for pol in polygons:
+        todo = [np.asarray(pol, dtype=np.float64)]
+        while todo:
+            pol = todo.pop()
+            if max_points <= 4 or len(pol) <= max_points:
+                out.append(pol)
+                continue
+            pieces = _fracture_cut(pol)
+            if pieces is None:
+                out.append(pol)
+            else:
+                todo += pieces[::-1]
+    return out
+
+
+def _fracture_cut(pol):
+    """
+    Chop a polygon into pieces that all have fewer vertices than it does.
+
+    :returns: The list of pieces, or None if no cut tried makes progress
+
+    The cuts tried are the median vertex coordinate and the middle of the
+    bounding box, then the gaps between consecutive vertex coordinates, first
+    across the longer side of the bounding box and then across the shorter.
+    Vertices left in line with their neighbours by a cut are dropped.
+    """
+    lo = pol.min(0)
+    hi = pol.max(0)
+    longer = np.argmax(hi - lo)
+    for axis in (longer, 1 - longer):
+        coords = np.unique(pol[:, axis])
+        positions = [np.median(pol[:, axis]), (lo[axis] + hi[axis]) / 2.]
+        positions += list((coords[1:] + coords[:-1]) / 2.)
+        for position in positions:
+            if not lo[axis] < position < hi[axis]:
+                continue
+            (pol1, pol2) = chop(pol, position, axis)
+            pieces = [_drop_collinear(np.asarray(p, dtype=np.float64)) for p in pol1 + pol2]
+            if all(len(p) < len(pol) for p in pieces):
+                return [p for p in pieces if len(p) > 2]
+    return None
+
+
+def _drop_collinear(pol):
+    """
+    Remove the vertices of a polygon that lie on the line between their
+    neighbours, including repeated vertices.
+    """
+    while len(pol) > 3:
+        prv = np.roll(pol, 1, axis=0)
+        nxt = np.roll(pol, -1, axis=0)
+        cross = (pol[:, 0] - prv[:, 0]) * (nxt[:, 1] - prv[:, 1]) - (pol[:, 1] - prv[:, 1]) * (nxt[:, 0] - prv[:, 0])
+        keep = np.abs(cross) > 1e-12 * (np.abs(pol).max() + 1) ** 2
+        if keep.all():
+            break
+        #drop one vertex at a time, so that neighbours are rechecked
+        pol = np.delete(pol, np.nonzero(~keep)[0][0], axis=0)
+    return pol
+
+
 def slice(layer, objects, position, axis, datatype=0):
     """
     **BROKEN** Slice polygons and polygon sets at given positions along an axis.
@@ -309,6 +680,7 @@ def slice(layer, objects, position, axis, datatype=0):
         Operand of the slice operation.  If this is a list, each element
         must be a ``Polygon``, ``PolygonSet``, ``CellReference``,
         ``CellArray``, or an array-like[N][2] of vertices of a polygon.
+        A ``Path`` is sliced as the outline of its full width.
     position : number or list of numbers
         Positions to perform the slicing operation along the specified
         axis.
@@ -330,34 +702,45 @@ def slice(layer, objects, position, axis, datatype=0):
     >>> result = gdspy.slice(1, ring, [-7, 7], 0)
     >>> cell.add(result[1])
     """
-    if (layer.__class__ != [].__class__):
+    if not isinstance(layer, list):
         layer = [layer]
-    if (objects.__class__ != [].__class__):
+    if not isinstance(objects, list):
         objects = [objects]
-    if (position.__class__ != [].__class__):
+    if isinstance(position, (list, tuple, np.ndarray)):
+        position = sorted(position)
+    else:
         position = [position]
-    position.sort()
     result = [[] for i in range(len(position) + 1)]
     polygons = []
     for obj in objects:
-        if isinstance(obj, Boundary):
-            polygons.append(obj.points)
-        elif isinstance(obj, Elements):
-            polygons += obj.polygons
-        elif isinstance(obj, CellReference) or isinstance(obj, CellArray):
-            polygons += obj.get_polygons()
-        else:
-            polygons.append(obj)
+        polygons.extend(_operand_polygons(obj))
+    polygons = [np.ascontiguousarray(pol, dtype=np.float64) for pol in polygons]
+    #keep the extent of each polygon along axis, only those straddling a
+    #position need to be chopped. The extents are reduced over all polygons
+    #at once.
+    if polygons:
+        lengths = [len(pol) for pol in polygons]
+        starts = np.cumsum(lengths) - lengths
+        coords = np.concatenate(polygons)[:, axis]
+        polygons = list(zip(polygons,
+                            np.minimum.reduceat(coords, starts).tolist(),
+                            np.maximum.reduceat(coords, starts).tolist()))
     for i, p in enumerate(position):
         nxt_polygons = []
-        for pol in polygons:
-            (pol1, pol2) = chop(pol, p, axis)
-            result[i] += pol1
-            nxt_polygons += pol2
+        for (pol, lo, hi) in polygons:
+            if hi <= p:
+                result[i].append(pol)
+            elif lo >= p:
+                nxt_polygons.append((pol, lo, hi))
+            else:
+                (pol1, pol2) = chop(pol, p, axis)
+                result[i] += pol1
+                for pol in pol2:
+                    nxt_polygons.append((pol, pol[:, axis].min(), pol[:, axis].max()))
         polygons = nxt_polygons
-    result[-1] = polygons
+    result[-1] = [pol for (pol, lo, hi) in polygons]
     for i in range(len(result)):
-        result[i] = Elements(layer[i % len(layer)], result[i], datatype)
+        result[i] = Elements(result[i], layer[i % len(layer)], datatype)
     return result
 
 
@@ -372,11 +755,14 @@ def boolean(layer, objects, operation, max_points=199, datatype=0, eps=1e-13):
     objects : array-like
         Operands of the boolean operation. Each element of this array must
         be a ``Polygon``, ``PolygonSet``, ``CellReference``, ``CellArray``,
-        or an array-like[N][2] of vertices of a polygon.
+        or an array-like[N][2] of vertices of a polygon. A ``Path`` takes
+        part as the outline of its full width.
     operation : function
         Function that accepts as input ``len(objects)`` integers.  Each
         integer represents the incidence of the corresponding ``object``.
-        The function must return a bool or integer (interpreted as bool).
+        The function must return a bool or integer (interpreted as bool),
+        and must amount to a union, intersection, difference or xor of one
+        or two operands.
     max_points : integer
         If greater than 4, fracture the resulting polygons to ensure they
         have at most ``max_points`` vertices. This is not a tessellating
@@ -386,8 +772,7 @@ def boolean(layer, objects, operation, max_points=199, datatype=0, eps=1e-13):
     datatype : integer
         The GDSII datatype for the resulting element (between 0 and 255).
     eps : positive number
-        Small number to be used as tolerance in intersection and overlap
-        calculations.
+        Unused, kept for compatibility.
 
     Returns
 
@@ -396,49 +781,35 @@ def boolean(layer, objects, operation, max_points=199, datatype=0, eps=1e-13):
 
     Notes
 
-    Since ``operation`` receives a list of integers as input, it can be
-    somewhat more general than boolean operations only. See the examples
-    below.
-
-    Because of roundoff errors there are a few cases when this function
-    can cause segmentation faults. If that happens, increasing the value
-    of ``eps`` might help.
+    The operation is done with Clipper, in integer coordinates, and needs
+    pyclipper. An operation that Clipper cannot do, such as
+    ``lambda p: p % 2``, raises a ValueError. Any holes in the result are
+    opened by cutting the polygon around them into strips.
 
     Examples
 
     >>> circle = gdspy.Round(0, (0, 0), 10)
     >>> triangle = gdspy.Round(0, (0, 0), 12, number_of_points=3)
-    >>> bad_poly = gdspy.L1Path(1, (0, 0), '+y', 2,
-            [6, 4, 4, 8, 4, 5, 10], [-1, -1, -1, 1, 1, 1])
     >>> union = gdspy.boolean(1, [circle, triangle],
             lambda cir, tri: cir or tri)
     >>> intersection = gdspy.boolean(1, [circle, triangle],
             lambda cir, tri: cir and tri)
     >>> subtraction = gdspy.boolean(1, [circle, triangle],
             lambda cir, tri: cir and not tri)
-    >>> multi_xor = gdspy.boolean(1, [badPath], lambda p: p % 2)
     """
+    if pyclipper is None:
+        raise ImportError('pyclipper is needed for boolean operations')
+    clip_type = _clipper_type(operation, len(objects))
+    if clip_type is None:
+        raise ValueError('The operation %r is not a union, intersection, difference '
+                         'or xor of one or two operands' % operation)
+
     polygons = []      
-    indices = [0]
-    special_function = False
+    counts = []
     for obj in objects:
-        if isinstance(obj, ElementBase):
-            polygons.append(obj.points)
-            indices.append(indices[-1] + 1)
-        elif isinstance(obj, Elements):
-            special_function = True
-            polygons += obj.polygons
-            indices.append(indices[-1] + len(obj.polygons))
-        elif isinstance(obj, CellReference) or isinstance(obj, CellArray):
-            special_function = True
-            a = obj.get_polygons()
-            polygons += a
-            indices.append(indices[-1] + len(a))
-        else:
-            polygons.append(obj)
-            indices.append(indices[-1] + 1)
-    if special_function:
-        result = boolext.clip(polygons, lambda *p: operation(*[sum(p[indices[ia]:indices[ia + 1]]) for ia in range(len(indices) - 1)]), eps)
-    else:
-        result = boolext.clip(polygons, operation, eps)
-    return None if result is None else Elements(layer, result, datatype, False).fracture(max_points)
+        pols = _operand_polygons(obj)
+        polygons.extend(pols)
+        counts.append(len(pols))
+    indices = np.concatenate(([0], np.cumsum(counts, dtype=int)))
+    result = _clipper_clip(polygons, indices, clip_type)
+    return None if result is None else Elements(_fracture(result, max_points), layer, datatype)
@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from gdsCAD import core, shapes
+
+
+class TestCellBoundingBox(unittest.TestCase):
+
+    def test_bbox_follows_add_and_remove(self):
+        cell = core.Cell('BBOX')
+        self.assertIsNone(cell.bounding_box)
+
+        rect = shapes.Rectangle((0, 0), (1, 1))
+        cell.add(rect)
+        self.assertEqual(cell.bounding_box.tolist(), [[0, 0], [1, 1]])
+
+        other = shapes.Rectangle((5, 5), (6, 7))
+        cell.add(other)
+        self.assertEqual(cell.bounding_box.tolist(), [[0, 0], [6, 7]])
+
+        cell.remove(other)
+        self.assertEqual(cell.bounding_box.tolist(), [[0, 0], [1, 1]])
+
+    def test_bbox_follows_in_place_changes(self):
+        cell = core.Cell('BBOX')
+        rect = shapes.Rectangle((0, 0), (1, 1))
+        cell.add(rect)
+        self.assertEqual(cell.bounding_box.tolist(), [[0, 0], [1, 1]])
+
+        rect.translate((2, 3))
+        self.assertEqual(cell.bounding_box.tolist(), [[2, 3], [3, 4]])
+
+        rect.points = [[0, 0], [4, 0], [4, 2]]
+        self.assertEqual(cell.bounding_box.tolist(), [[0, 0], [4, 2]])
+
+    def test_bbox_follows_referenced_cell(self):
+        sub = core.Cell('SUB')
+        sub.add(shapes.Rectangle((0, 0), (1, 1)))
+        top = core.Cell('TOP')
+        top.add(core.CellReference(sub, (10, 0)))
+        self.assertEqual(top.bounding_box.tolist(), [[10, 0], [11, 1]])
+
+        sub.add(shapes.Rectangle((0, 0), (2, 5)))
+        self.assertEqual(top.bounding_box.tolist(), [[10, 0], [12, 5]])
+
+    def test_bbox_follows_shared_children(self):
+        rect = shapes.Rectangle((0, 0), (1, 1))
+        sub = core.Cell('SUB')
+        sub.add(rect)
+        mid = core.Cell('MID')
+        ref = core.CellReference(sub, (10, 0))
+        mid.add(ref)
+        top = core.Cell('TOP')
+        top.add(core.CellReference(mid, (0, 10)))
+        top.add(core.CellReference(sub))
+        self.assertEqual(top.bounding_box.tolist(), [[0, 0], [11, 11]])
+
+        rect.translate((1, 0))
+        self.assertEqual(top.bounding_box.tolist(), [[1, 0], [12, 11]])
+        self.assertEqual(mid.bounding_box.tolist(), [[11, 0], [12, 1]])
+
+        ref.origin = (20, 0)
+        self.assertEqual(top.bounding_box.tolist(), [[1, 0], [22, 11]])
+
+    def test_bbox_copy_is_independent(self):
+        cell = core.Cell('BBOX')
+        cell.add(shapes.Rectangle((0, 0), (1, 1)))
+        bbox = cell.bounding_box
+        bbox += 5
+        self.assertEqual(cell.bounding_box.tolist(), [[0, 0], [1, 1]])
+
+
+class TestCellExtend(unittest.TestCase):
+
+    def test_extend_matches_add(self):
+        sub = core.Cell('SUB')
+        sub.add(shapes.Rectangle((0, 0), (1, 1)))
+        items = [shapes.Rectangle((0, 0), (2, 2)),
+                 core.Elements([[[0, 0], [1, 0], [1, 1]]]),
+                 core.CellArray(sub, 2, 2, (3, 3)),
+                 sub]
+
+        added = core.Cell('ADDED')
+        for e in items:
+            added.add(e)
+        extended = core.Cell('EXTENDED')
+        extended.extend(items)
+
+        self.assertEqual([type(e) for e in extended.elements],
+                         [type(e) for e in added.elements])
+        self.assertEqual(extended.bounding_box.tolist(), added.bounding_box.tolist())
+        self.assertIs(extended.references[-1].ref_cell, sub)
+
+    def test_extend_rejects_unknown_types(self):
+        cell = core.Cell('EXTEND')
+        self.assertRaises(TypeError, cell.extend, [shapes.Rectangle((0, 0), (1, 1)), 'text'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from gdsCAD import core, shapes, templates
+
+
+class TestBlock(unittest.TestCase):
+
+    def test_block_elements(self):
+        cell = core.Cell('CELL')
+        cell.add(shapes.Rectangle((0, 0), (100, 100), layer=1))
+        block = templates.Block('BLOCK', cell, (3000, 3000))
+
+        arrays = [e for e in block.elements if isinstance(e, core.CellArray)]
+        marks = [a for a in arrays if a.ref_cell is not cell]
+        tiles = [a for a in arrays if a.ref_cell is cell]
+        #one label, one array of alignment marks and the two tiled regions
+        self.assertEqual(len(block.elements), 4)
+        self.assertEqual(len(marks), 1)
+        self.assertEqual(len(tiles), 2)
+        self.assertNotEqual(tiles[0].origin.tolist(), tiles[1].origin.tolist())
+        self.assertEqual(block.N, sum(a.cols * a.rows for a in tiles))
+
+    def test_marks_shared_within_wafer_only(self):
+        cell = core.Cell('CELL')
+        cell.add(shapes.Rectangle((0, 0), (100, 100), layer=1))
+        marks = {}
+        a = templates.Block('A', cell, (3000, 3000), marks_cache=marks)
+        b = templates.Block('B', cell, (3000, 3000), marks_cache=marks)
+        c = templates.Block('C', cell, (3000, 3000))
+
+        self.assertIs(a.references[0].ref_cell, b.references[0].ref_cell)
+        self.assertIsNot(a.references[0].ref_cell, c.references[0].ref_cell)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+
+import numpy as np
+
+from gdsCAD import core, shapes, utils
+
+
+def _area(points):
+    (x, y) = np.asarray(points).T
+    return abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1))) / 2
+
+
+class TestChop(unittest.TestCase):
+
+    def test_chop_rectangle(self):
+        rect = np.array([[0, 0], [10, 0], [10, 4], [0, 4]], dtype=float)
+        (below, above) = utils.chop(rect, 3, 0)
+
+        self.assertEqual([_area(p) for p in below], [12])
+        self.assertEqual([_area(p) for p in above], [28])
+        self.assertEqual(below[0][:, 0].max(), 3)
+        self.assertEqual(above[0][:, 0].min(), 3)
+
+    def test_chop_concave(self):
+        u = np.array([[0, 0], [6, 0], [6, 4], [4, 4], [4, 1],
+                      [2, 1], [2, 4], [0, 4]], dtype=float)
+        (below, above) = utils.chop(u, 2.5, 1)
+
+        self.assertEqual(len(below), 1)
+        self.assertEqual(len(above), 2)
+        self.assertEqual(_area(below[0]), 12)
+        self.assertEqual(sorted(_area(p) for p in above), [3, 3])
+
+    def test_chop_one_side(self):
+        tri = np.array([[0, 0], [1, 0], [1, 1]], dtype=float)
+        (below, above) = utils.chop(tri, 5, 0)
+
+        self.assertEqual(len(below), 1)
+        self.assertEqual(above, [])
+        self.assertEqual(below[0].tolist(), tri.tolist())
+        self.assertIsNot(below[0], tri)
+
+
+class TestSlice(unittest.TestCase):
+
+    def test_slice_rectangle(self):
+        rect = shapes.Rectangle((0, 0), (10, 4))
+        out = utils.slice(2, rect, [3, 7], 0)
+
+        self.assertEqual(len(out), 3)
+        for e in out:
+            self.assertIsInstance(e, core.Elements)
+            self.assertEqual(e.layer, 2)
+        self.assertEqual([e.area() for e in out], [12, 16, 12])
+        self.assertEqual(out[1].bounding_box.tolist(), [[3, 0], [7, 4]])
+
+    def test_slice_layers_and_operands(self):
+        elist = core.Elements([[[0, 0], [4, 0], [4, 4], [0, 4]]], layer=1)
+        cell = core.Cell('SLICE')
+        cell.add(shapes.Rectangle((0, 0), (10, 4)))
+        ref = core.CellReference(cell, (1, 0))
+
+        out = utils.slice([5, 6], [elist, ref], 2, 1)
+
+        self.assertEqual([e.layer for e in out], [5, 6])
+        self.assertEqual([e.area() for e in out], [28, 28])
+
+    def test_slice_path(self):
+        path = core.Path([(0, 0), (10, 0)], width=2)
+        out = utils.slice(1, path, 4, 0)
+
+        self.assertEqual([e.area() for e in out], [8, 12])
+        self.assertEqual(out[0].bounding_box.tolist(), [[0, -1], [4, 1]])
+
+    def test_slice_empty_side(self):
+        out = utils.slice(1, [[[0, 0], [1, 0], [1, 1]]], 5, 0)
+
+        self.assertEqual([len(e) for e in out], [1, 0])
+        self.assertEqual(out[1].layer, 1)
+
+
+class TestBoolean(unittest.TestCase):
+
+    def test_difference_with_hole(self):
+        outer = shapes.Rectangle((0, 0), (10, 10))
+        inner = shapes.Rectangle((3, 3), (6, 6))
+        out = utils.boolean(1, [outer, inner], lambda a, b: a and not b)
+
+        self.assertEqual(out.layer, 1)
+        self.assertEqual(out.area(), 91)
+        self.assertEqual(out.bounding_box.tolist(), [[0, 0], [10, 10]])
+
+    def test_island_in_hole(self):
+        ring = utils.boolean(1, [shapes.Rectangle((0, 0), (10, 10)),
+                                 shapes.Rectangle((2, 2), (8, 8))],
+                             lambda a, b: a and not b)
+        island = shapes.Rectangle((4, 4), (6, 6))
+        out = utils.boolean(1, [ring, island], lambda a, b: a or b)
+
+        self.assertEqual(out.area(), 68)
+
+    def test_mixed_orientation(self):
+        #a polygon is inside whichever way its vertices wind
+        squares = [shapes.Rectangle((0, 0), (10, 10)).points,
+                   shapes.Rectangle((5, 0), (15, 10)).points[::-1]]
+        out = utils.boolean(1, [core.Elements(squares)], lambda a: a)
+        self.assertEqual(out.area(), 150)
+
+        cross = [shapes.Rectangle((0, 11), (20, 9)).points,
+                 shapes.Rectangle((9, 0), (11, 20)).points]
+        out = utils.boolean(1, [core.Elements(cross)], lambda a: a)
+        self.assertEqual(out.area(), 76)
+
+    def test_path_outline(self):
+        corner = core.Path([(0, 5), (0, 0), (5, 0)], width=1)
+        rect = shapes.Rectangle((-2, -2), (2, 2))
+        out = utils.boolean(1, [corner, rect], lambda a, b: a and b)
+        self.assertEqual(out.area(), 4)
+
+        line = core.Path([(0, 0), (10, 0)], width=2, pathtype=2)
+        out = utils.boolean(1, [line], lambda a: a)
+        self.assertEqual(out.bounding_box.tolist(), [[-1, -1], [11, 1]])
+
+    def test_unsupported_operation(self):
+        rect = shapes.Rectangle((0, 0), (1, 1))
+        self.assertRaises(ValueError, utils.boolean, 1, [rect], lambda p: p % 2)
+
+    def test_fracture_non_convex(self):
+        rs = np.random.RandomState(0)
+        angles = np.sort(rs.rand(12)) * 2 * np.pi
+        radii = np.where(np.arange(12) % 2, 3, 10) * (0.7 + 0.6 * rs.rand(12))
+        star = np.c_[radii * np.cos(angles), radii * np.sin(angles)]
+        out = utils.boolean(1, [core.Boundary(star)], lambda a: a, max_points=5)
+
+        self.assertGreater(len(out), 1)
+        self.assertAlmostEqual(out.area(), _area(star), places=4)
+
+    def test_union_and_intersection(self):
+        a = shapes.Rectangle((0, 0), (10, 10))
+        b = shapes.Rectangle((5, 5), (15, 15))
+
+        self.assertEqual(utils.boolean(1, [a, b], lambda a, b: a or b).area(), 175)
+        self.assertEqual(utils.boolean(1, [a, b], lambda a, b: a and b).area(), 25)
+
+
+class TestSplitLayers(unittest.TestCase):
+
+    def _cell(self):
+        sub = core.Cell('SUB')
+        sub.add(shapes.Rectangle((0, 0), (1, 1), layer=1))
+        sub.add(shapes.Rectangle((0, 0), (2, 2), layer=2))
+        top = core.Cell('TOP')
+        top.add(shapes.Rectangle((0, 0), (3, 3), layer=2))
+        top.add(core.CellReference(sub, (10, 0)))
+        return top
+
+    def test_split_by_layer(self):
+        top = self._cell()
+        (a, b) = utils.split_layers(top, [2])
+
+        self.assertEqual(a.get_layers(), [1])
+        self.assertEqual(b.get_layers(), [2])
+        self.assertEqual(a.area(), 1)
+        self.assertEqual(b.area(), 13)
+        self.assertEqual(b.bounding_box.tolist(), [[0, 0], [12, 3]])
+        #the original is left untouched
+        self.assertEqual(top.area(), 14)
+
+    def test_attributes_not_shared(self):
+        top = self._cell()
+        top.notes = ['top']
+        (a, b) = utils.split_layers(top, [2])
+
+        self.assertEqual(b.notes, ['top'])
+        self.assertIsNot(a.notes, b.notes)
+        self.assertIsNot(a.references[0].ref_cell, b.references[0].ref_cell)
+
+
+if __name__ == '__main__':
+    unittest.main()